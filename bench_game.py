@@ -0,0 +1,343 @@
+"""界面线程逐tick基准测试
+
+在Qt offscreen平台上构建Game，串口、图传和MQTT换成按模拟时钟回放脚本数据的替身：
+按给定分辨率和帧率出帧、按给定频率收到裁判端消息、定时出现一串命中。
+每个tick推进10ms模拟时间，依次运行Game._update、UI._sample_input，按界面刷新率运行Game._update_ui，
+再把标脏的区域画出来；统计每tick的CPU时间、内存分配和各控件的绘制次数，输出JSON。
+
+    python bench_game.py
+    python bench_game.py --size 1920x1080 --fps 60 --ticks 6000 -o game_baseline.json
+    python bench_game.py --painted-hud --pip-fps 15 --compare game_baseline.json  # CPU时间比基线差超过容差时返回1
+
+模拟时钟与墙钟无关，同样的参数每次回放同样的数据；第一遍只计时，第二遍开启tracemalloc统计分配和绘制次数。
+"""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore
+
+import numpy as np
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from bench_video import percentiles
+from mqtt import MQTT
+from video import LATENCY_STAMPS, LatencyStats, VideoFrame
+
+TICK = 0.010  # 与Game的逻辑定时器相同
+
+
+class ScriptedVideo:
+    """Video的替身：按模拟时钟以给定帧率交出BGRA帧，设置只记录不生效
+
+    帧默认按UI给的输出尺寸生成（与Video线程转换后的结果一致），也可固定为frame_size由界面缩放。
+    """
+
+    def __init__(self, fps: int, frame_size: tuple[int, int] | None = None):
+        self.fps = None
+        self.dropped = None
+        self.stalled = False
+        self.jitter = None
+        self.decode_mode = None
+        self.latency = LatencyStats()
+        self.recorder = None
+        self.frame = None
+
+        self._rate = fps
+        self._frame_size = frame_size
+        self._source = None
+        self._output_size = None
+        self._images = {}  # 尺寸 -> 预先生成的几帧画面，循环使用
+        self._seq = 0
+        self._next_time = 0.0
+
+    def start(self):
+        pass
+
+    def set_source(self, source):
+        self._source = source
+
+    def set_output_size(self, size):
+        self._output_size = size
+
+    def set_profile(self, profile): pass
+    def set_decode_threads(self, thread_type, thread_count=0): pass
+    def set_jitter_buffer(self, frames): pass
+    def set_recording(self, enabled, record_format="mkv"): pass
+    def set_match_state(self, countdown_ms, state): pass
+    def set_skip_frame(self, mode): pass
+    def set_max_fps(self, fps): pass
+    def set_output_format(self, output_format): pass
+
+    def last_reconnect_ttff(self, window=10.0):
+        return None
+
+    def _image(self, size):
+        images = self._images.get(size)
+        if images is None:
+            width, height = size
+            rng = np.random.default_rng(0)
+            images = self._images[size] = [rng.integers(0, 256, (height, width, 4), dtype=np.uint8) for _ in range(4)]
+        return images[self._seq % len(images)]
+
+    def advance(self, now: float):
+        if not self._rate or not self._source or now < self._next_time:
+            return
+        size = self._frame_size or self._output_size
+        if not size or size[0] <= 0 or size[1] <= 0:
+            return
+        self._next_time += 1 / self._rate
+        self._seq += 1
+        t = time.perf_counter()
+        stamps = [t - 0.005, t - 0.001, t] + [None] * (len(LATENCY_STAMPS) - 3)  # 读包、解码、转换各阶段的耗时固定
+        self.frame = VideoFrame(self._image(size), "bgra", self._seq, stamps, self.latency)
+        self.fps = self._rate
+
+
+class ScriptedUART:
+    """UART的替身：无线已连接，每hit_every秒出现一串hit_count次命中，RSSI每秒变化"""
+
+    def __init__(self, color="red", hit_every=5.0, hit_count=5, hit_interval=0.1):
+        self.connect_state = 2
+        self.color = color
+        self.hit_cnt = 0
+        self.tx_rssi = -40
+        self.rx_rssi = -45
+        self.last_air_ms = None
+        self.dbus_packet = bytes(10)
+
+        self._hit_every = hit_every
+        self._hit_count = hit_count
+        self._hit_interval = hit_interval
+
+    def start(self):
+        pass
+
+    def set_port(self, port):
+        pass
+
+    def advance(self, now: float):
+        if self._hit_every > 0 and self._hit_count > 0:
+            bursts, offset = divmod(now, self._hit_every)
+            self.hit_cnt = int(bursts) * self._hit_count + min(self._hit_count, int(offset / self._hit_interval))
+        second = int(now)
+        self.tx_rssi = -40 - second % 7
+        self.rx_rssi = -45 - second % 5
+
+
+class ScriptedMQTT:
+    """MQTT的替身：以rate Hz收到裁判端消息，先5秒赛前倒计时，再进行match_seconds秒的比赛"""
+
+    def __init__(self, rate=10, match_seconds=180):
+        self.referee_msg = MQTT.DEFAULT_REFEREE_MSG
+        self.client_msg = {}
+        self.color = None
+        self.freq = None
+
+        self._rate = rate
+        self._match_seconds = match_seconds
+        self._next_time = 0.0
+
+    def start(self):
+        pass
+
+    def set_broker_url(self, broker_url):
+        pass
+
+    def advance(self, now: float):
+        if not self._rate or now < self._next_time:
+            return
+        self._next_time += 1 / self._rate
+        countdown = now - 5 if now < 5 else max(0.0, self._match_seconds - (now - 5))
+        self.referee_msg = {  # 与真实消息一样每次是新的字典
+            "countdown_ms": int(countdown * 1000), "state": 0, "txt": "",
+            "red": {"name": "红方队伍", "hp": max(0, 100 - int(now / 2)), "yellow_card_ms": None, "reset_hp_ms": None},
+            "blue": {"name": "蓝方队伍", "hp": max(0, 100 - int(now / 3)), "yellow_card_ms": None, "reset_hp_ms": None},
+        }
+        self.freq = self._rate
+
+
+class PaintCounter(QtCore.QObject):
+    """按控件统计收到的Paint事件数"""
+
+    def __init__(self):
+        super().__init__()
+        self.counts = {}
+
+    def eventFilter(self, obj, e):
+        if e.type() == QtCore.QEvent.Paint:
+            name = type(obj).__name__
+            if obj.objectName():
+                name += "#" + obj.objectName()
+            self.counts[name] = self.counts.get(name, 0) + 1
+        return False
+
+
+def build_game(args):
+    from main import Game
+
+    frame_size = tuple(map(int, args.frame_size.split("x"))) if args.frame_size else None
+    scripted = [ScriptedUART(hit_every=args.hit_every, hit_count=args.hit_count),
+                ScriptedVideo(args.fps, frame_size), ScriptedVideo(args.pip_fps), ScriptedMQTT(args.referee_hz)]
+    game = Game(uart=scripted[0], video=scripted[1], pip_video=scripted[2], mqtt=scripted[3])
+
+    ui = game.ui
+    ui._input_timer.stop()  # 改为每tick调用一次，与逻辑定时器同频
+    ui.painted_hud = args.painted_hud
+    ui._update_hud_mode()
+    ui._update_ui_for_big_screen_mode()
+    if args.pip_fps:
+        ui.pip_source = "bench"
+    ui.resize(*map(int, args.size.split("x")))
+    ui.show()
+    ui.app.processEvents()
+    return game, scripted
+
+
+def run_ticks(game, scripted, start_tick, ticks, ui_hz, instrument=False) -> dict:
+    ui = game.ui
+    app = ui.app
+    update_request = QtCore.QEvent(QtCore.QEvent.UpdateRequest)
+    ui_interval = 1 / ui_hz
+    next_ui = start_tick * TICK
+
+    stages = {"update": [], "input": [], "update_ui": [], "paint": [], "tick": []}
+    wall, blocks, alloc_kb = [], [], []
+    frames, seq = 0, ui._frame_seq
+    counter = None
+    if instrument:
+        counter = PaintCounter()
+        app.installEventFilter(counter)
+        tracemalloc.start()
+    gc_before = [s["collections"] for s in gc.get_stats()]
+
+    for i in range(start_tick, start_tick + ticks):
+        now = i * TICK
+        for module in scripted:
+            module.advance(now)
+        if instrument:
+            tracemalloc.reset_peak()
+            traced = tracemalloc.get_traced_memory()[0]
+        b0 = sys.getallocatedblocks()
+        w0 = time.perf_counter()
+        c0 = time.thread_time()
+        game._update()
+        c1 = time.thread_time()
+        ui._sample_input()
+        c2 = time.thread_time()
+        if now >= next_ui:
+            next_ui += ui_interval
+            game._update_ui()
+        c3 = time.thread_time()
+        app.processEvents()  # 合并后的状态栏更新等
+        app.sendEvent(ui, update_request)  # 同步画出标脏的区域（发给窗口的QWindow会整窗重绘）
+        c4 = time.thread_time()
+        wall.append((time.perf_counter() - w0) * 1000)
+        blocks.append(sys.getallocatedblocks() - b0)
+        if instrument:
+            alloc_kb.append((tracemalloc.get_traced_memory()[1] - traced) / 1024)
+
+        for name, start, end in (("update", c0, c1), ("input", c1, c2), ("update_ui", c2, c3),
+                                 ("paint", c3, c4), ("tick", c0, c4)):
+            stages[name].append((end - start) * 1000)
+        if ui._frame_seq != seq:
+            seq = ui._frame_seq
+            frames += 1
+
+    gc_after = [s["collections"] for s in gc.get_stats()]
+    if instrument:
+        tracemalloc.stop()
+        app.removeEventFilter(counter)
+        seconds = ticks * TICK
+        return {
+            "alloc_kb_per_tick": percentiles(alloc_kb),
+            "paints_per_second": {name: round(count / seconds, 1)
+                                  for name, count in sorted(counter.counts.items(), key=lambda item: -item[1])},
+        }
+
+    result = {f"{name}_cpu_ms": percentiles(values) for name, values in stages.items()}
+    result["tick_cpu_ms"]["max"] = round(max(stages["tick"]), 3)
+    result["tick_wall_ms"] = percentiles(wall)
+    result["net_blocks_per_tick"] = percentiles(blocks)
+    result["gc_collections"] = [after - before for before, after in zip(gc_before, gc_after)]
+    result["frames_shown"] = frames
+    return result
+
+
+def compare(result: dict, baseline_path: str, tolerance: float) -> list:
+    """与基线比较每tick CPU时间的p50和p95，返回超出容差的项"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["result"]
+    failures = []
+    for key in ("tick_cpu_ms", "update_cpu_ms", "update_ui_cpu_ms", "paint_cpu_ms"):
+        for stat in ("p50", "p95"):
+            old, new = baseline[key][stat], result[key][stat]
+            if new > old * (1 + tolerance) and new - old > 0.02:  # 忽略计时精度以内的差别
+                failures.append(f"{key}.{stat}: {old} -> {new} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="界面线程逐tick基准测试")
+    parser.add_argument("--size", default="1920x1080", help="窗口尺寸")
+    parser.add_argument("--frame-size", help="视频帧尺寸，默认跟随UI给的输出尺寸")
+    parser.add_argument("--fps", type=int, default=60, help="主视频流帧率")
+    parser.add_argument("--pip-fps", type=int, default=0, help="画中画帧率，0为关闭")
+    parser.add_argument("--referee-hz", type=float, default=10, help="裁判端消息频率")
+    parser.add_argument("--hit-every", type=float, default=5.0, help="每隔多少秒出现一串命中")
+    parser.add_argument("--hit-count", type=int, default=5, help="每串命中次数")
+    parser.add_argument("--ui-hz", type=float, default=60, help="界面刷新率，Game._update_ui的调用频率")
+    parser.add_argument("--painted-hud", action="store_true", help="使用单层HUD")
+    parser.add_argument("--ticks", type=int, default=3000, help="计时的tick数（每tick 10ms模拟时间）")
+    parser.add_argument("--warmup", type=int, default=200, help="计时前先运行的tick数")
+    parser.add_argument("--compare", help="基线JSON，CPU时间超出容差时返回1")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="与基线比较的相对容差")
+    parser.add_argument("-o", "--output", help="JSON输出文件，默认打印到标准输出")
+    args = parser.parse_args()
+
+    game, scripted = build_game(args)
+    run_ticks(game, scripted, 0, args.warmup, args.ui_hz)
+    result = run_ticks(game, scripted, args.warmup, args.ticks, args.ui_hz)
+    result.update(run_ticks(game, scripted, args.warmup + args.ticks, args.ticks, args.ui_hz, instrument=True))
+    tick = result["tick_cpu_ms"]
+    print(f"{args.size} {args.fps}fps: 每tick CPU p50 {tick['p50']} ms, p95 {tick['p95']} ms, "
+          f"最大 {tick['max']} ms, 显示{result['frames_shown']}帧", file=sys.stderr)
+
+    baseline = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "qt": QtCore.qVersion(),
+            "qpa": game.ui.app.platformName(),
+        },
+        "config": vars(args),
+        "result": result,
+    }
+    text = json.dumps(baseline, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        failures = compare(result, args.compare, args.tolerance)
+        for failure in failures:
+            print(f"性能退化: {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""界面绘制微基准测试
+
+在Qt offscreen平台上把叠加层绘制到与窗口同尺寸的图像，统计每次绘制耗时，输出JSON。
+受击晕影同时测一遍逐帧构造全屏径向渐变的旧画法作为对照：两边都隐藏准星、只画晕影一层，都经QWidget.render绘制。
+
+    python bench_ui.py
+    python bench_ui.py --sizes 1920x1080 --repeat 500 -o ui_baseline.json
+
+--video-surface 是OpenGL画面的冒烟自测：把纯色的yuv420p/nv12帧交给VideoSurface绘制，读回帧缓冲检查颜色，
+打印实际使用的渲染器，失败时返回1。offscreen平台通常建不了OpenGL上下文，需要指定有OpenGL的平台，
+并强制Mesa软件渲染（llvmpipe），确认没有显卡驱动的电脑上也能用：
+
+    QT_QPA_PLATFORM=xcb LIBGL_ALWAYS_SOFTWARE=1 python bench_ui.py --video-surface   # Linux
+    set QT_QPA_PLATFORM=windows & set QT_OPENGL=software & python bench_ui.py --video-surface  # Windows，Qt自带的llvmpipe
+"""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore, QtGui, QtWidgets
+import av
+import numpy as np
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+SIZES = ("1280x720", "1920x1080", "2560x1440")
+SURFACE_COLOR = (200, 60, 30)  # OpenGL画面自测用的纯色（RGB）
+SURFACE_TOLERANCE = 12  # YUV往返和纹理过滤带来的误差
+HIT_PROGRESS = (0.1, 0.3, 0.5, 0.7, 0.9)  # 受击动画中的若干时刻
+
+
+def paint_gradient_vignette(device: QtGui.QPaintDevice, progress: float):
+    """旧画法：每帧构造覆盖全屏的径向渐变并抗锯齿填充"""
+    w, h = device.width(), device.height()
+    p = QtGui.QPainter(device)
+    p.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.SmoothPixmapTransform)
+    cx, cy = w // 2, h // 2
+    edge_alpha = int(180 * (1.0 - progress))
+    radius = int((w ** 2 + h ** 2) ** 0.5 / 2)
+    grad = QtGui.QRadialGradient(QtCore.QPointF(cx, cy), radius)
+    grad.setColorAt(0.0, QtGui.QColor(255, 50, 50, 0))
+    grad.setColorAt(0.6, QtGui.QColor(255, 50, 50, int(edge_alpha * 0.5)))
+    grad.setColorAt(1.0, QtGui.QColor(255, 50, 50, edge_alpha))
+    p.setBrush(QtGui.QBrush(grad))
+    p.setPen(QtCore.Qt.NoPen)
+    p.drawRect(0, 0, w, h)
+    p.end()
+
+
+class GradientVignette(QtWidgets.QWidget):
+    """对照组：窗口属性与Overlay相同，只按旧画法画受击晕影"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(QtCore.Qt.WA_NoSystemBackground, True)
+        self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
+        self.hit_progress = 0.0
+
+    def paintEvent(self, e):
+        if 0 < self.hit_progress < 1:  # 与Overlay相同的绘制条件
+            paint_gradient_vignette(self, self.hit_progress)
+
+
+def measure(paint, repeat: int) -> dict:
+    start = time.perf_counter()
+    paint()  # 第一次含缓存构建，单独记录
+    first = (time.perf_counter() - start) * 1000
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        paint()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {"p50": round(times[len(times) // 2], 3), "p95": round(times[int(len(times) * 0.95)], 3),
+            "mean": round(statistics.fmean(times), 3), "first": round(first, 3)}
+
+
+def run_size(size: str, repeat: int) -> dict:
+    from ui import Overlay
+
+    width, height = map(int, size.split("x"))
+    image = QtGui.QImage(width, height, QtGui.QImage.Format_ARGB32_Premultiplied)  # 与窗口后备缓冲相同的格式
+
+    overlay = Overlay()
+    overlay.resize(width, height)
+    gradient = GradientVignette()
+    gradient.resize(width, height)
+
+    def render(widget):
+        image.fill(0)
+        widget.render(image, QtCore.QPoint(), QtGui.QRegion(), QtWidgets.QWidget.RenderFlag(0))
+
+    result = {"size": size}
+    overlay.hit_progress = 0.0
+    result["overlay_idle_ms"] = measure(lambda: render(overlay), repeat)
+
+    overlay.setCrosshairVisible(False)  # 晕影对比只画晕影一层，与对照组相同
+    vignette = {}
+    for progress in HIT_PROGRESS:
+        overlay.hit_progress = gradient.hit_progress = progress
+        vignette[str(progress)] = {"cached": measure(lambda: render(overlay), repeat),
+                                   "gradient": measure(lambda: render(gradient), repeat)}
+    result["overlay_hit_ms"] = vignette
+    result["speedup_p50"] = round(statistics.fmean(v["gradient"]["p50"] / max(v["cached"]["p50"], 1e-6)
+                                                   for v in vignette.values()), 2)
+    return result
+
+
+def check_video_surface(app) -> bool:
+    """OpenGL画面冒烟自测：各像素格式的纯色帧经VideoSurface绘制后，读回的颜色应与原色一致"""
+    from ui import VideoSurface
+
+    surface = VideoSurface()
+    errors = []
+    surface.failed.connect(errors.append)
+    surface.resize(320, 240)
+    surface.show()
+    app.processEvents()
+    if not surface.isValid():
+        print("无法创建OpenGL上下文", file=sys.stderr)
+        return False
+    surface.makeCurrent()
+    f = surface.context().functions()
+    print(f"OpenGL: {f.glGetString(0x1F02)} / {f.glGetString(0x1F01)}", file=sys.stderr)  # GL_VERSION / GL_RENDERER
+    surface.doneCurrent()
+
+    ok = True
+    rgb = np.empty((240, 320, 3), np.uint8)
+    rgb[:] = SURFACE_COLOR
+    for pix_fmt in ("yuv420p", "nv12"):
+        surface.set_frame(av.VideoFrame.from_ndarray(rgb, format="rgb24").reformat(format=pix_fmt))
+        image = surface.grabFramebuffer()  # 在帧缓冲中执行paintGL
+        color = QtGui.QColor(image.pixel(image.width() // 2, image.height() // 2))
+        got = (color.red(), color.green(), color.blue())
+        passed = not errors and max(abs(a - b) for a, b in zip(got, SURFACE_COLOR)) <= SURFACE_TOLERANCE
+        print(f"{pix_fmt}: 期望 {SURFACE_COLOR}，读回 {got}，{'通过' if passed else '失败'}", file=sys.stderr)
+        ok = ok and passed
+    for error in errors:
+        print(error, file=sys.stderr)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="界面绘制微基准测试")
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=200, help="每项测量的绘制次数")
+    parser.add_argument("-o", "--output", help="JSON输出文件，默认打印到标准输出")
+    parser.add_argument("--video-surface", action="store_true", help="不跑基准，OpenGL画面冒烟自测，失败时返回1")
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv)
+
+    if args.video_surface:
+        sys.exit(0 if check_video_surface(app) else 1)
+
+    results = []
+    for size in args.sizes:
+        result = run_size(size, args.repeat)
+        hit = result["overlay_hit_ms"]["0.5"]
+        print(f"{size}: 晕影 {hit['gradient']['p50']} -> {hit['cached']['p50']} ms (p50, 进度0.5)", file=sys.stderr)
+        results.append(result)
+
+    baseline = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "qt": QtCore.qVersion(),
+            "qpa": app.platformName(),
+        },
+        "results": results,
+    }
+    text = json.dumps(baseline, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""图传解码基准测试
+
+用PyAV生成H.264/H.265/MJPEG测试视频，分别以本地文件、UDP/MPEG-TS推流和UDP裸码流推流的方式交给Video线程，
+可选再经过UI.set_frame（Qt offscreen），统计解码帧率、各阶段耗时、CPU占用和丢帧，输出JSON基线。
+
+    python bench_video.py                                   # 全部用例
+    python bench_video.py --codecs h264 --sizes 1280x720 --fps 60 --ui -o baseline.json
+
+文件用例不限速，测的是最大吞吐；UDP用例按帧率实时推流到本机，测的是实际链路下的表现和出图耗时。
+
+    python bench_video.py --self-check 60  # UDP回环自测：每种推流方式推60帧，没有全部解码出来时返回非0
+"""
+
+import av
+import numpy as np
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import sys
+import threading
+import time
+import logging
+
+from buffer_pool import POOL
+from video import LATENCY_STAGES, LatencyStats, Video, auto_thread_count
+
+BENCH_DIR = "bench_cache"  # 生成的测试视频，按参数命名，重复运行时复用
+
+# 编码器名, 像素格式, 编码参数
+CODECS = {
+    "h264": ("libx264", "yuv420p", {"preset": "ultrafast", "tune": "zerolatency"}),
+    "hevc": ("libx265", "yuv420p", {"preset": "ultrafast", "tune": "zerolatency", "x265-params": "log-level=error"}),
+    "mjpeg": ("mjpeg", "yuvj420p", {}),
+}
+SIZES = ("640x480", "1280x720", "1920x1080")
+FRAME_RATES = (30, 60)
+TRANSPORTS = ("file", "udp", "raw")  # raw为UDP推送的Annex-B裸流
+UDP_CODECS = ("h264", "hevc")  # MPEG-TS和裸流不承载MJPEG
+LOOPBACK_TAIL_FRAMES = 3  # 收端要等到下一帧的数据才能分出上一帧（裸流解析器、MPEG-TS的PES），自测时多推几帧
+
+
+def generate(codec: str, width: int, height: int, fps: int, seconds: float) -> str:
+    """生成测试视频（移动的渐变加噪声，避免编码器把画面压成静止帧），返回文件路径"""
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    path = os.path.join(BENCH_DIR, f"{codec}_{width}x{height}_{fps}fps_{seconds:g}s.mkv")
+    if os.path.exists(path):
+        return path
+
+    encoder, pix_fmt, options = CODECS[codec]
+    output = av.open(path + ".tmp", "w", format="matroska")
+    stream = output.add_stream(encoder, rate=fps, options=options)
+    stream.width = width
+    stream.height = height
+    stream.pix_fmt = pix_fmt
+    stream.gop_size = fps  # 每秒一个关键帧，与比赛用图传相近
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    noise = rng.integers(0, 32, (height, width, 3), dtype=np.uint8)
+    for i in range(int(fps * seconds)):
+        image = np.empty((height, width, 3), dtype=np.uint8)
+        image[..., 0] = (x + i * 4) % 256
+        image[..., 1] = (y + i * 2) % 256
+        image[..., 2] = ((x + y) / 2 + i * 3) % 256
+        image += np.roll(noise, i * 7, axis=1)
+        frame = av.VideoFrame.from_ndarray(image, format="rgb24")
+        for packet in stream.encode(frame):
+            output.mux(packet)
+    for packet in stream.encode():
+        output.mux(packet)
+    output.close()
+    os.replace(path + ".tmp", path)
+    return path
+
+
+class UDPSender(threading.Thread):
+    """把测试视频按帧率实时推成UDP/MPEG-TS流（raw_format指定时为裸码流），循环播放，时间戳连续
+
+    指定frames时推够这么多帧就结束。
+    """
+
+    def __init__(self, path: str, port: int, raw_format: str | None = None, frames: int | None = None):
+        super().__init__(daemon=True)
+        self.url = f"udp://127.0.0.1:{port}"
+        self.source = self.url if raw_format is None else f"{raw_format}+{self.url}"  # 交给Video的地址
+        self.sent_frames = 0
+        self._path = path
+        self._format = raw_format or "mpegts"
+        self._frames = frames
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        output = av.open(self.url + "?pkt_size=1316", "w", format=self._format)
+        output_stream = None
+        offset = 0  # 循环播放时累加的时间戳偏移
+        start = time.perf_counter()
+        while not self._stop_event.is_set():
+            with av.open(self._path) as source:
+                stream = source.streams.video[0]
+                if output_stream is None:
+                    output_stream = output.add_stream_from_template(stream)
+                time_base = stream.time_base
+                end = 0
+                for packet in source.demux(stream):
+                    if self._stop_event.is_set():
+                        break
+                    if packet.dts is None:
+                        continue
+                    end = packet.dts + max(packet.duration, 1)
+                    delay = start + float((packet.dts + offset) * time_base) - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    packet.dts += offset
+                    packet.pts += offset
+                    packet.stream = output_stream
+                    output.mux(packet)
+                    self.sent_frames += 1
+                    if self.sent_frames == self._frames:
+                        self._stop_event.set()
+                offset += end
+        output.close()
+
+
+def free_udp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentiles(values: list) -> dict | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return {"p50": round(values[len(values) // 2], 3), "p95": round(values[int(len(values) * 0.95)], 3),
+            "mean": round(statistics.fmean(values), 3)}
+
+
+def run_case(codec, size, fps, transport, seconds, output_size, ui=None) -> dict:
+    width, height = map(int, size.split("x"))
+    path = generate(codec, width, height, fps, max(seconds, 2))
+
+    sender = None
+    if transport in ("udp", "raw"):
+        sender = UDPSender(path, free_udp_port(), codec if transport == "raw" else None)
+        source = sender.source
+    else:
+        source = path
+
+    video = Video()
+    video.logger.setLevel(logging.CRITICAL)  # 文件用例会反复读到结尾重连，不刷屏
+    video.latency = LatencyStats(window=100000)  # 整个用例的样本都保留
+    video.set_profile("low_latency_udp")
+    video.set_output_size(output_size)
+    video.set_output_format(ui.get_video_format() if ui is not None else "bgra")
+    video.start()
+    if sender is not None:
+        video.set_source(source)  # 先开始监听，再推流
+        time.sleep(0.2)
+        sender.start()
+    else:
+        video.set_source(source)
+
+    # 等第一帧，不计入统计
+    open_start = time.perf_counter()
+    deadline = open_start + 10
+    while video.frame is None and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    if video.frame is None:
+        if sender is not None:
+            sender.stop()
+        return {"codec": codec, "size": size, "fps": fps, "transport": transport, "error": "没有出图"}
+    ttff = time.perf_counter() - open_start  # UDP用例含等待关键帧的时间
+
+    video.latency.clear()
+    seq_start = video.frame.seq
+    sent_start = sender.sent_frames if sender is not None else 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    shown = 0  # 消费方实际拿到的新帧
+    last_seq = seq_start
+    set_frame_times = []
+    while time.perf_counter() - wall_start < seconds:
+        frame = video.frame
+        if frame is not None and frame.seq != last_seq and not frame.stale:
+            shown += 1
+            last_seq = frame.seq
+            if ui is not None:
+                t = time.perf_counter()
+                ui.set_frame(frame)
+                set_frame_times.append((time.perf_counter() - t) * 1000)
+            else:
+                frame.mark_handoff()  # 没有UI时拿到即算显示
+                frame.mark_painted()
+        if ui is not None:
+            ui.app.processEvents()
+            time.sleep(0.01)  # 与Game的100Hz定时器一致
+        else:
+            time.sleep(0.001)
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    published = video.frame.seq - seq_start
+    if sender is not None:
+        sender.stop()
+        sent = sender.sent_frames - sent_start
+    video.set_source(None)
+
+    result = {
+        "codec": codec,
+        "size": size,
+        "fps": fps,
+        "transport": transport,
+        "decode_mode": video.decode_mode,
+        "ttff_ms": round(ttff * 1000, 1),
+        "decode_fps": round(published / wall, 1),
+        "shown_fps": round(shown / wall, 1),
+        "dropped_frames": published - shown,  # 已解码但消费方没拿到的帧
+        "cpu_percent": round(cpu / wall * 100, 1),  # 整个进程，多核时可超过100
+        "latency_ms": {stage: {"p50": round(video.latency.percentile(stage, 0.5) or 0, 3),
+                               "p95": round(video.latency.percentile(stage, 0.95) or 0, 3)}
+                       for stage in LATENCY_STAGES},
+    }
+    if sender is not None:
+        result["lost_frames"] = max(0, sent - published)  # 已推流但没有解码出来的帧
+    if ui is not None:
+        result["set_frame_ms"] = percentiles(set_frame_times)
+    result["buffer_pool"] = POOL.stats()  # 累计值，跨用例
+    return result
+
+
+def loopback_check(codec, transport, frames, fps=30) -> dict:
+    """UDP回环自测：推送frames帧（另加LOOPBACK_TAIL_FRAMES帧把它们推出来），检查Video全部收到并解码出来"""
+    path = generate(codec, 320, 240, fps, 2)
+    sent_frames = frames + LOOPBACK_TAIL_FRAMES
+    sender = UDPSender(path, free_udp_port(), codec if transport == "raw" else None, frames=sent_frames)
+
+    video = Video()
+    video.logger.setLevel(logging.CRITICAL)  # 推流结束后会判定断流，不刷屏
+    video.set_profile("low_latency_udp")
+    video.set_output_size((320, 240))
+    video.start()
+    video.set_source(sender.source)  # 先开始监听，再推流
+    time.sleep(0.2)
+    sender.start()
+
+    # 记录解出的第一帧和最后一帧的序号；推流结束后Video判定断流，换成调暗的保留帧，之后不会再有新帧
+    first = last = None
+    deadline = time.perf_counter() + sent_frames / fps + 5
+    while time.perf_counter() < deadline:
+        frame = video.frame
+        if frame is not None and not frame.stale:
+            if first is None:
+                first = frame.seq
+            last = frame.seq
+        elif frame is not None and not sender.is_alive():
+            break
+        time.sleep(0.001)
+    sender.stop()
+    video.set_source(None)
+
+    decoded = 0 if first is None else last - first + 1
+    return {"codec": codec, "transport": transport, "sent": sender.sent_frames, "decoded": decoded,
+            "ok": sender.sent_frames == sent_frames and frames <= decoded <= sent_frames}
+
+
+def self_check(codecs, transports, frames) -> bool:
+    ok = True
+    for codec in codecs:
+        for transport in transports:
+            if transport == "file" or codec not in UDP_CODECS:
+                continue
+            result = loopback_check(codec, transport, frames)
+            print(f"{codec} {transport}: 推送 {result['sent']} 帧，解码 {result['decoded']} 帧"
+                  f"（至少{frames}帧），{'通过' if result['ok'] else '失败'}", file=sys.stderr)
+            ok = ok and result["ok"]
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图传解码基准测试")
+    parser.add_argument("--codecs", nargs="+", default=list(CODECS), choices=list(CODECS))
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES))
+    parser.add_argument("--fps", nargs="+", type=int, default=list(FRAME_RATES))
+    parser.add_argument("--transports", nargs="+", default=list(TRANSPORTS), choices=TRANSPORTS)
+    parser.add_argument("--seconds", type=float, default=5.0, help="每个用例的统计时长")
+    parser.add_argument("--output-size", default="1280x720", help="Video输出尺寸，模拟显示区域")
+    parser.add_argument("--ui", action="store_true", help="同时经过UI.set_frame（Qt offscreen）")
+    parser.add_argument("-o", "--output", help="JSON输出文件，默认打印到标准输出")
+    parser.add_argument("--self-check", type=int, metavar="N",
+                        help="不跑基准，UDP回环推N帧检查全部解码出来，失败时返回1")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+    if args.self_check:
+        sys.exit(0 if self_check(args.codecs, args.transports, args.self_check) else 1)
+
+    ui = None
+    output_size = tuple(map(int, args.output_size.split("x")))
+    if args.ui:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from ui import UI
+        ui = UI()
+        ui.resize(*output_size)
+        ui.show()
+        ui.app.processEvents()
+        output_size = ui.get_video_size()
+
+    results = []
+    for codec in args.codecs:
+        for size in args.sizes:
+            for fps in args.fps:
+                for transport in args.transports:
+                    if transport != "file" and codec not in UDP_CODECS:
+                        continue
+                    result = run_case(codec, size, fps, transport, args.seconds, output_size, ui)
+                    print(f"{codec} {size} {fps}fps {transport}: "
+                          f"{result.get('decode_fps', '-')} fps, cpu {result.get('cpu_percent', '-')}%",
+                          file=sys.stderr)
+                    results.append(result)
+
+    baseline = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "auto_thread_count": auto_thread_count(),
+            "python": platform.python_version(),
+            "av": av.__version__,
+            "ffmpeg": av.library_versions.get("libavcodec"),
+        },
+        "ui": args.ui,
+        "output_size": list(output_size),
+        "results": results,
+    }
+    text = json.dumps(baseline, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
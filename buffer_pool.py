@@ -0,0 +1,117 @@
+import numpy as np
+
+import ctypes
+import threading
+import weakref
+import time
+import logging
+
+
+class BufferPool:
+    """按形状复用的ndarray缓冲区池，视频线程和UI线程共用
+
+    acquire()返回的ndarray是一次租用：它和由它切出的视图、QImage等都引用同一个
+    租用对象，这些引用全部释放后缓冲区才回到池中，所以帧对象还在使用时不会被改写；
+    都在使用中时才新分配。
+    分辨率或窗口尺寸变化后，旧形状的缓冲区闲置超过idle_seconds即释放。
+    """
+
+    def __init__(self, max_per_key=4, idle_seconds=2.0, level=logging.WARNING):
+        self.logger = logging.getLogger("BufferPool")
+        self.logger.setLevel(level)
+
+        self._max_per_key = max_per_key  # 每种形状最多保留的缓冲区数，超出的用完即丢
+        self._idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._buffers = {}  # (shape, dtype, tag) -> [[存储区, 是否已租出]]
+        self._used_time = {}  # (shape, dtype, tag) -> 最近一次取用的时间
+
+        # 统计
+        self._hits = 0
+        self._allocations = 0
+        self._overflows = 0  # 缓冲区都在使用中且已达上限，分配了不回收的临时缓冲区
+        self._released = 0
+
+    def acquire(self, shape: tuple, dtype=np.uint8, tag=None) -> np.ndarray:
+        """取一个空闲缓冲区，内容为上次使用后的数据；新分配的缓冲区内容为0
+
+        tag用于区分形状相同但用法不同的缓冲区，例如黑边位置不同的画布。
+        """
+        key = (tuple(shape), np.dtype(dtype), tag)
+        now = time.perf_counter()
+        with self._lock:
+            buffers = self._buffers.get(key)
+            if buffers is None:
+                self._release_idle(now)
+                buffers = self._buffers[key] = []
+            self._used_time[key] = now
+
+            for entry in buffers:
+                if not entry[1]:
+                    self._hits += 1
+                    return self._lease(key, entry)
+
+            if len(buffers) >= self._max_per_key:
+                self._overflows += 1
+                return np.zeros(key[0], dtype=key[1])
+
+            entry = [bytearray(int(np.prod(key[0])) * key[1].itemsize), False]  # bytearray分配时已清零
+            buffers.append(entry)
+            self._allocations += 1
+            self.logger.debug(f"分配缓冲区 {key[0]} {key[1]}，共{len(buffers)}个")
+            return self._lease(key, entry)
+
+    @staticmethod
+    def _lease(key, entry):
+        # 每次租用新建一个ctypes数组作为ndarray的base，切片、.data等派生对象都引用它，
+        # 它被回收即说明这次租出的内存已没有任何使用者
+        entry[1] = True
+        lease = (ctypes.c_uint8 * len(entry[0])).from_buffer(entry[0])
+        weakref.finalize(lease, BufferPool._return, entry)
+        return np.ndarray(key[0], dtype=key[1], buffer=lease)
+
+    @staticmethod
+    def _return(entry):
+        # 可能在任意线程的垃圾回收中调用，包括持有_lock的acquire()内，所以不加锁；单次赋值本身是原子的
+        entry[1] = False
+
+    def _release_idle(self, now):
+        for key in [key for key, used in self._used_time.items() if now - used > self._idle_seconds]:
+            self._released += len(self._buffers.pop(key))
+            del self._used_time[key]
+            self.logger.debug(f"释放闲置缓冲区 {key[0]} {key[1]}")
+
+    def stats(self) -> dict:
+        """池状态，用于调试"""
+        with self._lock:
+            return {
+                "keys": len(self._buffers),
+                "buffers": sum(len(buffers) for buffers in self._buffers.values()),
+                "bytes": sum(len(entry[0]) for buffers in self._buffers.values() for entry in buffers),
+                "hits": self._hits,
+                "allocations": self._allocations,
+                "overflows": self._overflows,
+                "released": self._released,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._released += sum(len(buffers) for buffers in self._buffers.values())
+            self._buffers.clear()
+            self._used_time.clear()
+
+
+POOL = BufferPool()  # 进程内共用
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+    # 模拟视频线程：每帧取一个缓冲区，最近两帧仍被UI持有
+    pool = BufferPool(level=logging.DEBUG)
+    held = []
+    for i in range(100):
+        buffer = pool.acquire((1080, 1920, 4))
+        buffer[0, 0, 0] = i
+        held = (held + [buffer])[-2:]
+    print(pool.stats())
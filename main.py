@@ -1,13 +1,17 @@
 from PySide6 import QtCore, QtGui
+import multiprocessing
 import time
 import logging
 
 from uart import UART
-from video import Video
+from video import PipBudget, Video
+from video_process import VideoProcess
 from mqtt import MQTT
+from profiler import PROFILER
 from ui import UI
 
 FULL_SCREEN = True
+VIDEO_PROCESS = False  # 在独立进程中解码，不与界面线程争抢GIL
 
 
 class Watch:
@@ -29,10 +33,13 @@ class Watch:
 
 
 class Game:
-    def __init__(self):
-        self.uart = UART()
-        self.video = Video()
-        self.mqtt = MQTT()
+    def __init__(self, uart=None, video=None, pip_video=None, mqtt=None):
+        # 各模块可由外部传入，bench_game.py用回放脚本数据的替身
+        self.uart = uart or UART()
+        self.video = video or (VideoProcess() if VIDEO_PROCESS else Video())
+        self.pip_video = pip_video or (VideoProcess() if VIDEO_PROCESS else Video())  # 画中画副视频流
+        self.pip_budget = PipBudget()
+        self.mqtt = mqtt or MQTT()
         self.ui = UI()
 
         # 状态变量
@@ -47,12 +54,15 @@ class Game:
         # 启动各模块的线程
         self.uart.start()
         self.video.start()
+        self.pip_video.start()
         self.mqtt.start()
 
-        # 创建定时任务
+        # 游戏逻辑和各模块的设置走100Hz定时器，界面更新跟随显示器刷新
         timer = QtCore.QTimer()
+        timer.setTimerType(QtCore.Qt.PreciseTimer)
         timer.timeout.connect(self._update)
         timer.start(10)  # 100Hz
+        self.ui.frame_clock.tick.connect(self._update_ui)
 
         # UI主循环
         if FULL_SCREEN:
@@ -61,11 +71,41 @@ class Game:
             self.ui.loop((1280, 720))
 
     def _update(self):
-        self._update_ui()
+        PROFILER.lateness("逻辑定时器迟到", 0.010)
+        self._update_game()
         self._update_com()
         self._update_video()
         self._update_mqtt()
 
+    @PROFILER.profile("Game._update_game")
+    def _update_game(self):
+        color = self.uart.color
+
+        # 击打检测
+        if self.watch_hit_cnt.update(self.uart.hit_cnt):
+            if self.uart.hit_cnt != 0: # 防止装甲板重启后扣血
+                self.hp -= 1
+                self.ui.trigger_hit()
+
+        # 颜色变化时，防止额外的重置血量和黄牌警告
+        if self.watch_color.update(color):
+            self.watch_reset_hp_ms.reset()
+            self.watch_yellow_card_ms.reset()
+
+        # 重置血量
+        if color:  # 串口连上了，能获取到颜色
+            reset_hp_ms = self.mqtt.referee_msg[color]["reset_hp_ms"]
+            if self.watch_reset_hp_ms.update(reset_hp_ms):
+                self.hp = 100
+
+        # 黄牌警告
+        if color:  # 串口连上了，能获取到颜色
+            yellow_card_ms = self.mqtt.referee_msg[color]["yellow_card_ms"]
+            if self.watch_yellow_card_ms.update(yellow_card_ms):
+                self.hp -= 10  # 扣血10%
+                self.yellow_card_start_time = time.time()
+
+    @PROFILER.profile("Game._update_ui")
     def _update_ui(self):
         # 1. 从串口更新数据
         
@@ -79,12 +119,6 @@ class Game:
         color = self.uart.color
         self.ui.set_color(color)
         
-        # 击打检测
-        if self.watch_hit_cnt.update(self.uart.hit_cnt):
-            if self.uart.hit_cnt != 0: # 防止装甲板重启后扣血
-                self.hp -= 1
-                self.ui.trigger_hit()
-        
         # 设置血量
         if color == 'red':
             self.ui.set_red_hp(self.hp)
@@ -93,7 +127,16 @@ class Game:
 
         # 2. 从图传更新数据
         self.ui.set_frame(self.video.frame)
+        self.ui.set_pip_frame(self.pip_video.frame)
         self.ui.set_video_fps(self.video.fps)
+        self.ui.set_video_dropped(self.video.dropped)
+        self.ui.set_video_stalled(self.video.stalled)
+        self.ui.set_video_jitter(self.video.jitter)
+        self.ui.set_video_decode_mode(self.video.decode_mode)
+        self.ui.set_video_latency(self.video.latency.summary())
+        self.ui.set_video_reconnect(self.video.last_reconnect_ttff())
+        recorder = self.video.recorder
+        self.ui.set_recording_state((recorder.segments, recorder.dropped_segments) if recorder else None)
 
         # 3. 从MQTT更新数据
         # MQTT频率
@@ -110,24 +153,6 @@ class Game:
         self.ui.set_red_hp(self.mqtt.referee_msg["red"]["hp"])
         self.ui.set_blue_hp(self.mqtt.referee_msg["blue"]["hp"])
 
-        # 颜色变化时，防止额外的重置血量和黄牌警告
-        if self.watch_color.update(color):
-            self.watch_reset_hp_ms.reset()
-            self.watch_yellow_card_ms.reset()
-
-        # 重置血量
-        if color:  # 串口连上了，能获取到颜色
-            reset_hp_ms = self.mqtt.referee_msg[color]["reset_hp_ms"]
-            if self.watch_reset_hp_ms.update(reset_hp_ms):
-                self.hp = 100
-
-        # 黄牌警告
-        if color:  # 串口连上了，能获取到颜色
-            yellow_card_ms = self.mqtt.referee_msg[color]["yellow_card_ms"]
-            if self.watch_yellow_card_ms.update(yellow_card_ms):
-                self.hp -= 10  # 扣血10%
-                self.yellow_card_start_time = time.time()
-
         # 中心文字
         state = self.mqtt.referee_msg["state"]
         txt = self.mqtt.referee_msg["txt"]
@@ -155,6 +180,7 @@ class Game:
         else:
             self.ui.set_center_txt("", "")
 
+    @PROFILER.profile("Game._update_com")
     def _update_com(self):
         # 设置串口号
         self.uart.set_port(self.ui.get_serial_port())
@@ -162,10 +188,33 @@ class Game:
         # 设置键鼠报文
         self.uart.dbus_packet = self.ui.get_dbus_packet()
 
+    @PROFILER.profile("Game._update_video")
     def _update_video(self):
-        # 设置视频源
+        # 设置视频源、延迟模式、解码线程和平滑缓冲
+        self.video.set_profile(self.ui.get_video_profile())
+        self.video.set_decode_threads(self.ui.get_decode_threads())
+        self.video.set_jitter_buffer(self.ui.get_jitter_buffer())
         self.video.set_source(self.ui.get_video_source())
 
+        # 比赛录制，分段按裁判端比赛状态标记
+        self.video.set_recording(self.ui.get_recording())
+        self.video.set_match_state(self.mqtt.referee_msg["countdown_ms"], self.mqtt.referee_msg["state"])
+
+        # 视频线程按显示区域尺寸和画面类型输出
+        self.video.set_output_size(self.ui.get_video_size())
+        self.video.set_output_format(self.ui.get_video_format())
+
+        # 画中画副视频流：单线程解码、小尺寸输出，按主视频流的负载限制帧率
+        max_fps, skip_frame = self.pip_budget.update(self.video)
+        self.pip_video.set_profile(self.ui.get_video_profile())
+        self.pip_video.set_decode_threads("NONE")
+        self.pip_video.set_skip_frame(skip_frame)
+        self.pip_video.set_max_fps(max_fps)
+        self.pip_video.set_source(self.ui.get_pip_source() or None)
+        self.pip_video.set_output_size(self.ui.get_pip_size())
+        self.pip_video.set_output_format("bgra")
+
+    @PROFILER.profile("Game._update_mqtt")
     def _update_mqtt(self):
         # 设置MQTT地址
         self.mqtt.set_broker_url(self.ui.get_mqtt_url())
@@ -183,6 +232,7 @@ class Game:
 
 
 def main():
+    multiprocessing.freeze_support()  # 打包后解码子进程从同一个exe启动
     logging.basicConfig(level=logging.ERROR, format='%(asctime)s | %(levelname)s | %(name)s | %(message)s')
 
     game = Game()
@@ -0,0 +1,113 @@
+from collections import deque
+import functools
+import time
+import logging
+
+
+class FrameProfiler:
+    """界面线程各段耗时的滚动统计，用于排查卡顿
+
+    用profile装饰需要统计的函数（游戏逻辑各段、paintEvent等），用lateness记录定时回调的迟到时间。
+    未启用时只多一次函数调用和一次判断，不记录样本。
+    """
+
+    def __init__(self, window_seconds=5.0, interval=0.5, level=logging.WARNING):
+        self.logger = logging.getLogger("FrameProfiler")
+        self.logger.setLevel(level)
+
+        self.enabled = False
+        self.window_seconds = window_seconds  # 只统计最近这段时间的样本
+        self._interval = interval  # 统计结果缓存时间，避免每次读取都排序
+        self._samples = {}  # 名称 -> deque[(时间, 毫秒)]，按第一次出现的顺序
+        self._last_call = {}  # 名称 -> 上一次回调的时间，用于计算迟到
+        self._summary = {}
+        self._summary_time = 0.0
+        self._start_time = time.perf_counter()  # 开始统计的时间，不满一个统计窗口时按实际时长算频率
+
+    def set_enabled(self, enabled: bool):
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        self.clear()
+        self.logger.info("性能分析已开启" if enabled else "性能分析已关闭")
+
+    def profile(self, name: str):
+        """装饰器：启用时记录每次调用的耗时"""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    end = time.perf_counter()
+                    self._record(name, (end - start) * 1000, end)
+
+            return wrapper
+
+        return decorator
+
+    def lateness(self, name: str, interval: float):
+        """周期回调开头调用，记录比预定间隔interval（秒）晚了多少"""
+        now = time.perf_counter()
+        last = self._last_call.get(name)
+        self._last_call[name] = now
+        if self.enabled and last is not None:
+            self._record(name, max(0.0, (now - last - interval) * 1000), now)
+
+    def _record(self, name, ms, now):
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque()
+        samples.append((now, ms))
+        while now - samples[0][0] > self.window_seconds:
+            samples.popleft()
+
+    def summary(self) -> dict:
+        """{名称: (p50, p99, 最大值, 每秒次数)}，单位毫秒"""
+        now = time.perf_counter()
+        if now - self._summary_time > self._interval:
+            self._summary_time = now
+            span = max(1e-3, min(self.window_seconds, now - self._start_time))
+            summary = {}
+            for name, samples in self._samples.items():
+                while samples and now - samples[0][0] > self.window_seconds:
+                    samples.popleft()
+                if not samples:
+                    continue
+                values = sorted(ms for _, ms in samples)
+                n = len(values)
+                summary[name] = (values[n // 2], values[min(n - 1, int(n * 0.99))], values[-1], n / span)
+            self._summary = summary
+        return self._summary
+
+    def clear(self):
+        self._samples.clear()
+        self._last_call.clear()
+        self._summary = {}
+        self._summary_time = 0.0
+        self._start_time = time.perf_counter()
+
+
+PROFILER = FrameProfiler()  # 进程内共用，界面线程使用
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+    profiler = FrameProfiler(level=logging.INFO)
+    profiler.set_enabled(True)
+
+    @profiler.profile("sleep_2ms")
+    def work():
+        time.sleep(0.002)
+
+    for _ in range(100):
+        profiler.lateness("10ms定时器", 0.010)
+        work()
+        time.sleep(0.008)
+    for name, (p50, p99, peak, rate) in profiler.summary().items():
+        print(f"{name}: p50 {p50:.2f} ms, p99 {p99:.2f} ms, 最大 {peak:.2f} ms, {rate:.0f}次/秒")
@@ -0,0 +1,201 @@
+import av
+
+import io
+import json
+import os
+import queue
+import threading
+import time
+import logging
+
+RECORD_DIR = "recordings"
+SEGMENT_SECONDS = 60  # 每段时长，到时后在下一个关键帧切段
+QUEUE_SIZE = 900  # 待写入数据包上限，约30秒@30fps
+
+# 容器格式 -> (扩展名, 打开参数)；mp4用分片写入，程序异常退出时已写部分仍可播放
+RECORD_FORMATS = {
+    "mkv": ("mkv", "matroska", {}),
+    "mp4": ("mp4", "mp4", {"movflags": "frag_keyframe+empty_moov"}),
+}
+
+
+class Recorder(threading.Thread):
+    """把demux出的压缩数据包直接封装为分段文件，不重新解码/编码
+
+    push() 由视频线程调用，从不阻塞；写盘在本线程完成。
+    stop() 后不再接收新数据包，已入队的写完再关闭当前段。
+    写盘跟不上时丢弃当前段剩余部分，到下一个关键帧再开新段，并计数。
+    """
+
+    def __init__(self, directory=RECORD_DIR, record_format="mkv", segment_seconds=SEGMENT_SECONDS,
+                 level=logging.WARNING):
+        super().__init__(daemon=True)
+
+        self.logger = logging.getLogger("Recorder")
+        self.logger.setLevel(level)
+
+        # 可读取
+        self.segments = 0  # 已完成的段数
+        self.dropped_segments = 0  # 因写盘跟不上而截断的段数
+
+        self._directory = directory
+        self._extension, self._format, self._options = RECORD_FORMATS[record_format]
+        self._segment_seconds = segment_seconds
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._stop_event = threading.Event()  # 置位后push()不再入队
+
+        # 视频线程侧状态
+        self._input_stream = None
+        self._dropping = False  # 丢包中，等待下一个关键帧
+
+        # 比赛状态，开新段时写入文件名和元数据
+        self._match_state = {"countdown_ms": None, "state": None}
+
+        # 写入线程侧状态
+        self._template = None  # 输入流参数的内存副本
+        self._output = None
+        self._output_stream = None
+        self._segment_path = None
+        self._segment_start = 0.0
+        self._segment_state = None
+        self._ts_offset = 0
+        self._last_dts = None
+
+    def set_match_state(self, countdown_ms, state):
+        self._match_state = {"countdown_ms": countdown_ms, "state": state}
+
+    def push(self, packet):
+        """提交一个已解码完的数据包，队列满时丢弃直到下一个关键帧"""
+        if packet.size == 0 or packet.dts is None or self._stop_event.is_set():
+            return
+
+        if packet.stream is not self._input_stream:
+            # 输入容器关闭后原流参数失效，先在内存中复制一份
+            template_container = av.open(io.BytesIO(), "w", format="matroska")
+            template = template_container.add_stream_from_template(packet.stream)
+            if not self._put(("stream", (template_container, template))):
+                return
+            self._input_stream = packet.stream
+
+        kind = "packet"
+        if self._dropping:
+            if not packet.is_keyframe:
+                return
+            kind = "resync"  # 从关键帧重新开段
+        if self._put((kind, packet)):
+            self._dropping = False
+
+    def _put(self, item) -> bool:
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            if not self._dropping:
+                self._dropping = True
+                self.dropped_segments += 1
+                self.logger.warning(f"写盘跟不上，丢弃当前段剩余部分（累计{self.dropped_segments}段）")
+            return False
+
+    def stop(self):
+        """队尾放入结束标记，录制线程写完之前入队的数据包后退出"""
+        self._stop_event.set()
+        self._queue.put(("stop", None))  # push()已停止入队，队列满时最多等写入线程写完一个包
+
+    def run(self):
+        self.logger.info("录制线程启动")
+        os.makedirs(self._directory, exist_ok=True)
+
+        while True:
+            kind, item = self._queue.get()
+            if kind == "stop":
+                break
+
+            try:
+                if kind == "stream":
+                    self._close_segment()
+                    self._template = item
+                elif kind == "resync":
+                    self._close_segment()
+                    self._write(item)
+                elif kind == "packet":
+                    self._write(item)
+            except Exception as e:
+                self.logger.error(f"录制写入报错: {e}")
+                self._close_segment()
+
+        self._close_segment()
+        self.logger.info("录制线程退出")
+
+    def _write(self, packet):
+        if self._template is None:
+            return
+
+        if self._output is not None and packet.dts - self._ts_offset <= self._last_dts:
+            self.logger.info("视频流时间戳不连续，重新开段")
+            self._close_segment()
+
+        if self._output is None or (packet.is_keyframe and self._should_roll()):
+            if not packet.is_keyframe:
+                return  # 每段必须从关键帧开始
+            self._close_segment()
+            self._open_segment(packet)
+
+        # 时间戳从段首关键帧开始计
+        packet.dts -= self._ts_offset
+        if packet.pts is not None:
+            packet.pts -= self._ts_offset
+        self._last_dts = packet.dts
+        packet.stream = self._output_stream
+        self._output.mux(packet)
+
+    def _should_roll(self) -> bool:
+        if time.time() - self._segment_start >= self._segment_seconds:
+            return True
+        return self._match_state["state"] != self._segment_state  # 比赛状态变化时切段
+
+    def _open_segment(self, packet):
+        match_state = self._match_state
+        state, countdown_ms = match_state["state"], match_state["countdown_ms"]
+        state_txt = "na" if state is None else state
+        countdown_txt = "na" if countdown_ms is None else countdown_ms // 1000
+        name = f"{time.strftime('%Y%m%d_%H%M%S')}_state{state_txt}_t{countdown_txt}.{self._extension}"
+        path = os.path.join(self._directory, name)
+
+        output = av.open(path, "w", format=self._format, options=self._options)
+        output.metadata["comment"] = json.dumps(match_state)
+        self._output_stream = output.add_stream_from_template(self._template[1])
+        self._output = output
+        self._segment_path = path
+        self._segment_start = time.time()
+        self._segment_state = match_state["state"]
+        self._ts_offset = packet.dts
+        self._last_dts = -1
+        self.logger.info(f"开始录制分段: {path}")
+
+    def _close_segment(self):
+        if self._output is None:
+            return
+        try:
+            self._output.close()
+            self.segments += 1
+            self.logger.info(f"录制分段完成: {self._segment_path}")
+        except Exception as e:
+            self.logger.error(f"关闭录制分段报错: {e}")
+        self._output = None
+        self._output_stream = None
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+    # 把一个视频文件按10秒分段转封装
+    recorder = Recorder(segment_seconds=10, level=logging.INFO)
+    recorder.start()
+    container = av.open(sys.argv[1])
+    for packet in container.demux(video=0):
+        recorder.push(packet)
+    recorder.stop()
+    recorder.join()
+    print(f"完成 {recorder.segments} 段，丢弃 {recorder.dropped_segments} 段")
@@ -2,9 +2,14 @@ from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6.QtCore import QUrl
 from PySide6.QtGui import QIcon
 from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PySide6.QtOpenGL import QOpenGLBuffer, QOpenGLShader, QOpenGLShaderProgram, QOpenGLTexture
+from PySide6.QtOpenGLWidgets import QOpenGLWidget
 from serial.tools import list_ports
 
+from profiler import PROFILER
+
 import numpy as np
+import array
 import re
 import os
 import sys
@@ -12,6 +17,30 @@ import time
 import logging
 
 DEFAULT_BROKER_URL = "mqtt://192.168.10.2:1883"
+DEFAULT_VIDEO_PROFILE = "low_latency_tcp"
+
+# 视频延迟模式（显示名, Video.set_profile参数）
+VIDEO_PROFILES = [
+    ("低延迟 (TCP)", "low_latency_tcp"),
+    ("低延迟 (UDP)", "low_latency_udp"),
+    ("默认缓冲", "default"),
+]
+
+# 解码线程模式（显示名, Video.set_decode_threads参数）
+DECODE_THREAD_MODES = [
+    ("片级多线程", "SLICE"),
+    ("帧级多线程", "FRAME"),
+    ("自动", "AUTO"),
+    ("单线程", "NONE"),
+]
+
+# 平滑缓冲（显示名, Video.set_jitter_buffer参数：缓冲帧数）
+JITTER_BUFFER_MODES = [
+    ("关闭（最低延迟）", 0),
+    ("1帧", 1),
+    ("2帧", 2),
+    ("3帧", 3),
+]
 
 INPUT_MAX_DX = 32768   # 每秒允许的最大鼠标X位移（像素），映射到±32768
 INPUT_MAX_DY = 32768   # 每秒允许的最大鼠标Y位移（像素），映射到±32768
@@ -28,6 +57,58 @@ def get_resource(path):
         return path
 
 
+class StatusLine(QtWidgets.QWidget):  # 状态栏的一行：分段着色的纯文本，直接绘制，不经过富文本解析
+
+    def __init__(self, parent=None, objectName=None):
+        super().__init__(parent)
+        if objectName:
+            self.setObjectName(objectName)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        self._segments = []  # [(文字, 颜色或None)]，None为默认白色
+        self._text = ""
+        self._colors = {None: QtGui.QColor(255, 255, 255)}
+
+    def set_segments(self, segments: list) -> bool:
+        """内容没变时直接返回False，不重绘"""
+        if segments == self._segments:
+            return False
+        self._segments = segments
+        self._text = "".join(text for text, _ in segments)
+        self.update()
+        return True
+
+    def text(self) -> str:
+        return self._text
+
+    def sizeHint(self):
+        fm = self.fontMetrics()
+        return QtCore.QSize(fm.horizontalAdvance(self._text), fm.height())
+
+    def minimumSizeHint(self):
+        return QtCore.QSize(0, self.fontMetrics().height())
+
+    def changeEvent(self, e):
+        if e.type() == QtCore.QEvent.FontChange:
+            self.updateGeometry()
+        super().changeEvent(e)
+
+    @PROFILER.profile("StatusLine.paintEvent")
+    def paintEvent(self, e):
+        fm = self.fontMetrics()
+        x = (self.width() - fm.horizontalAdvance(self._text)) / 2
+        y = (self.height() - fm.height()) / 2 + fm.ascent()
+        p = QtGui.QPainter(self)
+        p.setRenderHints(QtGui.QPainter.TextAntialiasing)
+        for text, color in self._segments:
+            qcolor = self._colors.get(color)
+            if qcolor is None:
+                qcolor = self._colors[color] = QtGui.QColor(color)
+            p.setPen(qcolor)
+            p.drawText(QtCore.QPointF(x, y), text)
+            x += fm.horizontalAdvance(text)
+        p.end()
+
+
 class Overlay(QtWidgets.QWidget):  # 叠加层（准星 + 受击晕影 + 居中大字）
 
     hitProgressChanged = QtCore.Signal(float)
@@ -45,6 +126,11 @@ class Overlay(QtWidgets.QWidget):  # 叠加层（准星 + 受击晕影 + 居中
         self.center_text_line2 = ""
         self.center_text_color = QtGui.QColor(255, 255, 255)
 
+        # 静态图层缓存（按设备像素比渲染），尺寸、文字或颜色变化时置为None重建
+        self._crosshair_cache = None  # (QPixmap, 左上角坐标)
+        self._center_text_cache = None
+        self._vignette_cache = None  # 受击晕影，按最大强度渲染，绘制时按进度调整不透明度
+
     # <-- 新增：控制准星可见性的方法 -->
     def setCrosshairVisible(self, visible: bool):
         """设置准星是否可见"""
@@ -53,10 +139,14 @@ class Overlay(QtWidgets.QWidget):  # 叠加层（准星 + 受击晕影 + 居中
             self.update()  # 请求重绘
 
     def set_center_text(self, line1: str, line2: str, color="white"):  # 如果未提供颜色，则默认为白色
-        """设置居中大字的内容和颜色"""
+        """设置居中大字的内容和颜色，内容不变时不重绘"""
+        color = QtGui.QColor(color)
+        if (line1, line2, color) == (self.center_text_line1, self.center_text_line2, self.center_text_color):
+            return
         self.center_text_line1 = line1
         self.center_text_line2 = line2
-        self.center_text_color = QtGui.QColor(color)
+        self.center_text_color = color
+        self._center_text_cache = None
         self.update()
 
     def setHitProgress(self, value: float):
@@ -69,135 +159,420 @@ class Overlay(QtWidgets.QWidget):  # 叠加层（准星 + 受击晕影 + 居中
 
     hitProgress = QtCore.Property(float, fget=getHitProgress, fset=setHitProgress, notify=hitProgressChanged)
 
-    def paintEvent(self, e):
+    def resizeEvent(self, e):
+        self._crosshair_cache = None
+        self._center_text_cache = None
+        self._vignette_cache = None
+        super().resizeEvent(e)
+
+    def changeEvent(self, e):
+        if e.type() == QtCore.QEvent.FontChange:
+            self._center_text_cache = None
+        super().changeEvent(e)
+
+    def _layer(self, width, height):
+        """按设备像素比创建透明图层，返回(QPixmap, QPainter)，坐标为逻辑像素"""
+        dpr = self.devicePixelRatioF()
+        pixmap = QtGui.QPixmap(max(1, int(width * dpr)), max(1, int(height * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(QtCore.Qt.transparent)
+        p = QtGui.QPainter(pixmap)
+        p.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing)
+        return pixmap, p
+
+    def _render_crosshair(self):
+        w, h = self.width(), self.height()
+        cx, cy = w // 2, h // 2
+        size = int(min(w, h) * 0.03)
+        gap = int(size * 0.25)
+        margin = 2  # 留出线宽
+        pixmap, p = self._layer(size * 2 + margin * 2, size * 2 + margin * 2)
+        c = size + margin  # 图层内的中心
+        p.setPen(QtGui.QPen(QtGui.QColor(250, 250, 250, 230), 2))
+        p.drawLine(c - size, c, c - gap, c)
+        p.drawLine(c + gap, c, c + size, c)
+        p.drawLine(c, c - size, c, c - gap)
+        p.drawLine(c, c + gap, c, c + size)
+        p.drawEllipse(QtCore.QPoint(c, c), int(size * 0.18), int(size * 0.18))
+        p.end()
+        return pixmap, QtCore.QPoint(cx - c, cy - c)
+
+    def _render_vignette(self):
         w, h = self.width(), self.height()
+        pixmap, p = self._layer(w, h)
+        cx, cy = w // 2, h // 2
+        radius = int((w ** 2 + h ** 2) ** 0.5 / 2)
+        grad = QtGui.QRadialGradient(QtCore.QPointF(cx, cy), radius)
+        grad.setColorAt(0.0, QtGui.QColor(255, 50, 50, 0))
+        grad.setColorAt(0.6, QtGui.QColor(255, 50, 50, 90))
+        grad.setColorAt(1.0, QtGui.QColor(255, 50, 50, 180))
+        p.setPen(QtCore.Qt.NoPen)
+        p.fillRect(0, 0, w, h, QtGui.QBrush(grad))
+        p.end()
+        return pixmap, QtCore.QPoint(0, 0)
+
+    def _render_center_text(self):
+        w, h = self.width(), self.height()
+
+        # 1. 设置字体
+        font1 = QtGui.QFont(self.font().family(), int(h * 0.08), QtGui.QFont.Bold)
+        font2 = QtGui.QFont(self.font().family(), int(h * 0.05), QtGui.QFont.Bold)
+
+        # 2. 计算文本尺寸以确定背景大小
+        rect1 = QtGui.QFontMetrics(font1).boundingRect(self.center_text_line1)
+        rect2 = QtGui.QFontMetrics(font2).boundingRect(self.center_text_line2)
+        text_w = max(rect1.width(), rect2.width())
+        spacing = int(h * 0.02)
+        text_h = rect1.height() + rect2.height() + spacing
+
+        padding_x = int(w * 0.05)
+        padding_y = int(h * 0.03)
+        bg_w = text_w + padding_x * 2
+        bg_h = text_h + padding_y * 2
+        pixmap, p = self._layer(bg_w, bg_h)
+
+        # 3. 绘制半透明背景
+        p.setPen(QtCore.Qt.NoPen)
+        p.setBrush(QtGui.QColor(0, 0, 0, 100))  # 半透明黑色背景
+        p.drawRoundedRect(QtCore.QRectF(0, 0, bg_w, bg_h), 20.0, 20.0)  # 圆角
+
+        # 4. 绘制两行文字
+        p.setPen(QtGui.QPen(self.center_text_color))
+        line1_rect = QtCore.QRectF(0, padding_y, bg_w, rect1.height())
+        line2_rect = QtCore.QRectF(0, line1_rect.bottom() + spacing, bg_w, rect2.height())
+        if self.center_text_line1:
+            p.setFont(font1)
+            p.drawText(line1_rect, QtCore.Qt.AlignCenter, self.center_text_line1)
+        if self.center_text_line2:
+            p.setFont(font2)
+            p.drawText(line2_rect, QtCore.Qt.AlignCenter, self.center_text_line2)
+        p.end()
+        return pixmap, QtCore.QPoint((w - bg_w) // 2, (h - bg_h) // 2)
+
+    @PROFILER.profile("Overlay.paintEvent")
+    def paintEvent(self, e):
+        dpr = self.devicePixelRatioF()
+        for cache in (self._crosshair_cache, self._center_text_cache, self._vignette_cache):
+            if cache is not None and cache[0].devicePixelRatio() != dpr:  # 窗口移到了缩放比例不同的屏幕
+                self._crosshair_cache = self._center_text_cache = self._vignette_cache = None
+                break
         p = QtGui.QPainter(self)
-        p.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.SmoothPixmapTransform)
 
         # 准星
         # <-- 修改：仅在 crosshair_visible 为 True 时绘制 -->
         if self.crosshair_visible:
-            cx, cy = w // 2, h // 2
-            size = int(min(w, h) * 0.03)
-            gap = int(size * 0.25)
-            p.setPen(QtGui.QPen(QtGui.QColor(250, 250, 250, 230), 2))
-            p.drawLine(cx - size, cy, cx - gap, cy)
-            p.drawLine(cx + gap, cy, cx + size, cy)
-            p.drawLine(cx, cy - size, cx, cy - gap)
-            p.drawLine(cx, cy + gap, cx, cy + size)
-            p.drawEllipse(QtCore.QPoint(cx, cy), int(size * 0.18), int(size * 0.18))
-
-        # 受击晕影
-        if self.hit_progress > 0:
-            # 即使准星隐藏，中心点坐标也需要计算
-            cx, cy = w // 2, h // 2
-            edge_alpha = int(180 * (1.0 - self.hit_progress))
-            radius = int((w ** 2 + h ** 2) ** 0.5 / 2)
-            grad = QtGui.QRadialGradient(QtCore.QPointF(cx, cy), radius)
-            grad.setColorAt(0.0, QtGui.QColor(255, 50, 50, 0))
-            grad.setColorAt(0.6, QtGui.QColor(255, 50, 50, int(edge_alpha * 0.5)))
-            grad.setColorAt(1.0, QtGui.QColor(255, 50, 50, edge_alpha))
-            p.setBrush(QtGui.QBrush(grad))
-            p.setPen(QtCore.Qt.NoPen)
-            p.drawRect(0, 0, w, h)
+            if self._crosshair_cache is None:
+                self._crosshair_cache = self._render_crosshair()
+            pixmap, pos = self._crosshair_cache
+            p.drawPixmap(pos, pixmap)
+
+        # 受击晕影：强度随进度线性减弱，等价于整体不透明度
+        if 0 < self.hit_progress < 1:
+            if self._vignette_cache is None:
+                self._vignette_cache = self._render_vignette()
+            p.setOpacity(1.0 - self.hit_progress)
+            p.drawPixmap(self._vignette_cache[1], self._vignette_cache[0])
+            p.setOpacity(1.0)
 
         # 居中大字 (此部分逻辑不受准星可见性影响)
         if self.center_text_line1 or self.center_text_line2:
-            p.save()  # 保存当前painter状态
-
-            # 1. 设置字体
-            font1 = QtGui.QFont(self.font().family(), int(h * 0.08), QtGui.QFont.Bold)
-            font2 = QtGui.QFont(self.font().family(), int(h * 0.05), QtGui.QFont.Bold)
-
-            # 2. 计算文本尺寸以确定背景大小
-            fm1 = QtGui.QFontMetrics(font1)
-            rect1 = fm1.boundingRect(self.center_text_line1)
-            fm2 = QtGui.QFontMetrics(font2)
-            rect2 = fm2.boundingRect(self.center_text_line2)
-
-            # 计算总宽度和高度
-            text_w = max(rect1.width(), rect2.width())
-            spacing = int(h * 0.02)
-            text_h = rect1.height() + rect2.height() + spacing
-
-            # 3. 绘制半透明背景
-            padding_x = int(w * 0.05)
-            padding_y = int(h * 0.03)
-            bg_w = text_w + padding_x * 2
-            bg_h = text_h + padding_y * 2
-
-            bg_rect = QtCore.QRectF(
-                (w - bg_w) / 2,
-                (h - bg_h) / 2,
-                bg_w,
-                bg_h
-            )
-            p.setPen(QtCore.Qt.NoPen)
-            p.setBrush(QtGui.QColor(0, 0, 0, 100))  # 半透明黑色背景
-            p.drawRoundedRect(bg_rect, 20.0, 20.0)  # 圆角
-
-            # 4. 绘制两行文字
-            p.setPen(QtGui.QPen(self.center_text_color))
-
-            # 定义每行文本的绘制区域
-            line1_rect = QtCore.QRectF(
-                bg_rect.x(),
-                bg_rect.y() + padding_y,
-                bg_rect.width(),
-                rect1.height()
-            )
-            line2_rect = QtCore.QRectF(
-                bg_rect.x(),
-                line1_rect.y() + line1_rect.height() + spacing,
-                bg_rect.width(),
-                rect2.height()
-            )
-
-            # 绘制第一行
-            if self.center_text_line1:
-                p.setFont(font1)
-                p.drawText(line1_rect, QtCore.Qt.AlignCenter, self.center_text_line1)
-
-            # 绘制第二行
-            if self.center_text_line2:
-                p.setFont(font2)
-                p.drawText(line2_rect, QtCore.Qt.AlignCenter, self.center_text_line2)
-
-            p.restore()  # 恢复painter状态
+            if self._center_text_cache is None:
+                self._center_text_cache = self._render_center_text()
+            pixmap, pos = self._center_text_cache
+            p.drawPixmap(pos, pixmap)
 
         p.end()
 
 
-class HealthBar(QtWidgets.QFrame):  # 血条
-    def __init__(self, parent=None, label_text="HP", team=None, height=64):
+class VideoLabel(QtWidgets.QLabel):  # QLabel视频画面，绘制完成后发出painted用于延迟统计
+
+    painted = QtCore.Signal()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dimmed = False  # 断线期间保留的最后一帧，调暗显示
+        self._image = None  # BGRA画面，绘制时直接引用，不转换为QPixmap
+        self._qimage = None
+
+    def set_image(self, image):
+        """直接引用image绘制，不复制；持有引用期间缓冲池不会把它交给视频线程改写"""
+        h, w = image.shape[:2]
+        self._image = image
+        self._qimage = QtGui.QImage(image.data, w, h, image.strides[0], QtGui.QImage.Format_RGB32)
+        self.update()
+
+    @PROFILER.profile("VideoLabel.paintEvent")
+    def paintEvent(self, e):
+        super().paintEvent(e)
+        if self._qimage is not None:
+            painter = QtGui.QPainter(self)
+            rect = self.contentsRect()
+            size = self._qimage.size()
+            if size != rect.size():  # 窗口尺寸刚变化，视频线程还没跟上，绘制时缩放
+                size = size.scaled(rect.size(), QtCore.Qt.KeepAspectRatio)
+            target = QtCore.QRect(QtCore.QPoint(0, 0), size)
+            target.moveCenter(rect.center())
+            painter.drawImage(target, self._qimage)
+            painter.end()
+        if self.dimmed:
+            painter = QtGui.QPainter(self)
+            painter.fillRect(self.rect(), QtGui.QColor(0, 0, 0, 150))
+            painter.end()
+        self.painted.emit()
+
+
+# OpenGL常量（QOpenGLFunctions只接受整数）
+GL_TEXTURE_2D = 0x0DE1
+GL_TEXTURE0 = 0x84C0
+GL_TEXTURE_MIN_FILTER = 0x2801
+GL_TEXTURE_MAG_FILTER = 0x2800
+GL_TEXTURE_WRAP_S = 0x2802
+GL_TEXTURE_WRAP_T = 0x2803
+GL_LINEAR = 0x2601
+GL_CLAMP_TO_EDGE = 0x812F
+GL_UNPACK_ALIGNMENT = 0x0CF5
+GL_LUMINANCE = 0x1909
+GL_LUMINANCE_ALPHA = 0x190A
+GL_UNSIGNED_BYTE = 0x1401
+GL_FLOAT = 0x1406
+GL_COLOR_BUFFER_BIT = 0x4000
+GL_TRIANGLE_STRIP = 0x0005
+
+# 只用GLSL 1.10 / ES 2.0的特性，Mesa软件渲染也能运行
+VIDEO_VERTEX_SHADER = """
+attribute vec2 a_pos;
+attribute vec2 a_tex;
+varying vec2 v_tex;
+void main() {
+    v_tex = a_tex;
+    gl_Position = vec4(a_pos, 0.0, 1.0);
+}
+"""
+
+VIDEO_FRAGMENT_SHADER = """
+#ifdef GL_ES
+precision mediump float;
+#endif
+varying vec2 v_tex;
+uniform sampler2D tex_y;
+uniform sampler2D tex_u;
+uniform sampler2D tex_v;
+uniform vec2 crop;       // 有效宽度/行宽，去掉行尾对齐填充（x: 亮度，y: 色度）
+uniform float nv12;      // 1.0时tex_u为交错的UV平面
+uniform vec3 offset;
+uniform vec3 coef_r;
+uniform vec3 coef_g;
+uniform vec3 coef_b;
+uniform float brightness;  // 断线期间保留的最后一帧调暗显示
+void main() {
+    float y = texture2D(tex_y, vec2(v_tex.x * crop.x, v_tex.y)).r;
+    vec2 tc = vec2(v_tex.x * crop.y, v_tex.y);
+    vec4 uv = texture2D(tex_u, tc);
+    float v = mix(texture2D(tex_v, tc).r, uv.a, nv12);
+    vec3 yuv = vec3(y, uv.r, v) - offset;
+    gl_FragColor = vec4(vec3(dot(coef_r, yuv), dot(coef_g, yuv), dot(coef_b, yuv)) * brightness, 1.0);
+}
+"""
+
+# YUV转RGB系数（偏移, R行, G行, B行）
+YUV_MATRICES = {
+    "bt601": ((16 / 255, 0.5, 0.5), (1.164, 0.0, 1.596), (1.164, -0.392, -0.813), (1.164, 2.017, 0.0)),
+    "bt709": ((16 / 255, 0.5, 0.5), (1.164, 0.0, 1.793), (1.164, -0.213, -0.533), (1.164, 2.112, 0.0)),
+    "full": ((0.0, 0.5, 0.5), (1.0, 0.0, 1.402), (1.0, -0.344, -0.714), (1.0, 1.772, 0.0)),
+}
+
+# 顶点缓冲：位置、纹理坐标、顺时针旋转90度的纹理坐标（三角形条带：左下、右下、左上、右上）
+QUAD_VERTICES = array.array("f", [
+    -1.0, -1.0, 1.0, -1.0, -1.0, 1.0, 1.0, 1.0,
+    0.0, 1.0, 1.0, 1.0, 0.0, 0.0, 1.0, 0.0,
+    1.0, 1.0, 1.0, 0.0, 0.0, 1.0, 0.0, 0.0,
+])
+QUAD_TEXCOORDS_OFFSET = 8 * 4
+QUAD_TEXCOORDS_ROTATED_OFFSET = 16 * 4
+
+
+class VideoSurface(QOpenGLWidget):  # OpenGL视频画面（上传YUV平面，着色器完成颜色转换和缩放）
+
+    failed = QtCore.Signal(str)  # 初始化失败，应回退到QLabel画面
+    painted = QtCore.Signal()
+
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.setObjectName("healthBar")
+        self.setObjectName("videoSurface")
+        self._frame = None  # 待显示的av.VideoFrame（yuv420p/yuvj420p/nv12）
+        self._dimmed = False
+        self._program = None
+        self._vertices = None
+        self._textures = []
+        self._texture_sizes = [None, None, None]
+
+    def set_frame(self, av_frame, dimmed=False):
+        self._frame = av_frame
+        self._dimmed = dimmed
+        self.update()
+
+    def initializeGL(self):
+        program = QOpenGLShaderProgram(self)
+        if not (program.addShaderFromSourceCode(QOpenGLShader.Vertex, VIDEO_VERTEX_SHADER)
+                and program.addShaderFromSourceCode(QOpenGLShader.Fragment, VIDEO_FRAGMENT_SHADER)
+                and program.link()):
+            self.failed.emit(f"着色器编译失败: {program.log()}")
+            return
+
+        vertices = QOpenGLBuffer(QOpenGLBuffer.VertexBuffer)
+        if not vertices.create():
+            self.failed.emit("创建顶点缓冲失败")
+            return
+        vertices.bind()
+        vertices.allocate(QUAD_VERTICES.tobytes(), len(QUAD_VERTICES) * QUAD_VERTICES.itemsize)
+        vertices.release()
+
+        self._textures = []
+        for _ in range(3):
+            texture = QOpenGLTexture(QOpenGLTexture.Target2D)
+            if not texture.create():
+                self.failed.emit("创建纹理失败")
+                return
+            self._textures.append(texture)
+        self._texture_sizes = [None, None, None]
+        self._vertices = vertices
+        self._program = program
+
+    @PROFILER.profile("VideoSurface.paintGL")
+    def paintGL(self):
+        f = self.context().functions()
+        f.glClearColor(0.0, 0.0, 0.0, 1.0)
+        f.glClear(GL_COLOR_BUFFER_BIT)
+
+        frame = self._frame
+        if self._program is None or frame is None:
+            return
+        try:
+            self._draw(f, frame)
+        except Exception as e:  # 驱动或绑定不支持时回退到QLabel画面，不在每次重绘时报错
+            self._program = None
+            self.failed.emit(f"绘制失败: {e}")
+            return
+        self.painted.emit()
+
+    def _draw(self, f, frame):
+        nv12 = frame.format.name == "nv12"
+        rotate = frame.height > frame.width
+        src_w, src_h = (frame.height, frame.width) if rotate else (frame.width, frame.height)
+
+        # 保持宽高比居中（视口单位为物理像素）
+        ratio = self.devicePixelRatioF()
+        out_w, out_h = self.width() * ratio, self.height() * ratio
+        scale = min(out_w / src_w, out_h / src_h)
+        dst_w, dst_h = int(src_w * scale), int(src_h * scale)
+        f.glViewport(int((out_w - dst_w) / 2), int((out_h - dst_h) / 2), dst_w, dst_h)
+
+        chroma_w, chroma_h = (frame.width + 1) // 2, (frame.height + 1) // 2
+        f.glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        planes = frame.planes
+        self._upload(f, 0, planes[0], planes[0].line_size, frame.height, GL_LUMINANCE)
+        if nv12:
+            self._upload(f, 1, planes[1], planes[1].line_size // 2, chroma_h, GL_LUMINANCE_ALPHA)
+            crop_uv = chroma_w / (planes[1].line_size // 2)
+        else:
+            self._upload(f, 1, planes[1], planes[1].line_size, chroma_h, GL_LUMINANCE)
+            self._upload(f, 2, planes[2], planes[2].line_size, chroma_h, GL_LUMINANCE)
+            crop_uv = chroma_w / planes[1].line_size
+
+        if frame.format.name == "yuvj420p" or frame.color_range == 2:
+            matrix = YUV_MATRICES["full"]
+        elif frame.height >= 720:
+            matrix = YUV_MATRICES["bt709"]
+        else:
+            matrix = YUV_MATRICES["bt601"]
+
+        program = self._program
+        program.bind()
+        for unit, name in enumerate((b"tex_y", b"tex_u", b"tex_v")):
+            program.setUniformValue1i(name, unit)
+        program.setUniformValue(b"crop", QtGui.QVector2D(frame.width / planes[0].line_size, crop_uv))
+        program.setUniformValue1f(b"nv12", 1.0 if nv12 else 0.0)
+        program.setUniformValue1f(b"brightness", 0.4 if self._dimmed else 1.0)
+        for name, value in zip((b"offset", b"coef_r", b"coef_g", b"coef_b"), matrix):
+            program.setUniformValue(name, QtGui.QVector3D(*value))
+
+        self._vertices.bind()
+        program.enableAttributeArray(b"a_pos")
+        program.enableAttributeArray(b"a_tex")
+        program.setAttributeBuffer(b"a_pos", GL_FLOAT, 0, 2)
+        program.setAttributeBuffer(b"a_tex", GL_FLOAT, QUAD_TEXCOORDS_ROTATED_OFFSET if rotate else QUAD_TEXCOORDS_OFFSET, 2)
+        f.glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+        program.disableAttributeArray(b"a_pos")
+        program.disableAttributeArray(b"a_tex")
+        self._vertices.release()
+        program.release()
+
+    def _upload(self, f, unit, plane, width, height, gl_format):
+        """按行宽上传整块平面内存，不做拷贝，行尾填充由着色器裁掉
+
+        pixels须传支持缓冲区协议的对象：PySide6把整数当作非法参数值拒绝，不会当作指针
+        """
+        f.glActiveTexture(GL_TEXTURE0 + unit)
+        self._textures[unit].bind()
+        size = (width, height, gl_format)
+        if self._texture_sizes[unit] != size:
+            f.glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+            f.glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+            f.glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+            f.glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+            f.glTexImage2D(GL_TEXTURE_2D, 0, gl_format, width, height, 0, gl_format, GL_UNSIGNED_BYTE, memoryview(plane))
+            self._texture_sizes[unit] = size
+        else:
+            f.glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height, gl_format, GL_UNSIGNED_BYTE, memoryview(plane))
+
+
+class HealthBarPainter:  # 血条的绘制，HealthBar控件和单层HUD共用
+    """背景、渐变和字体按尺寸缓存，数值文字缓存为QStaticText，每次绘制只填充血量部分"""
+
+    def __init__(self, label_text="HP", team=None):
         self.value = 100
         self.team = team
         self.label_text = label_text
-        self.setFixedHeight(height)
-        self.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
 
-    def set_value(self, value: int):
+        # 按尺寸和颜色缓存的背景、渐变和字体，变化时置为None重建
+        self._chrome = None
+        self._text = None  # 当前数值的QStaticText
+
+    def set_value(self, value: int) -> bool:
+        """数值没变时返回False"""
+        if value == self.value:
+            return False
         self.value = value
-        self.update()
+        self._text = None
+        return True
 
-    def set_color(self, team: str | None):
-        self.team = team if team in ("red", "blue") else None
-        self.update()
+    def set_color(self, team: str | None) -> bool:
+        team = team if team in ("red", "blue") else None
+        if team == self.team:
+            return False
+        self.team = team
+        self.invalidate()
+        return True
 
-    def paintEvent(self, e):
-        w, h = self.width(), self.height()
-        p = QtGui.QPainter(self)
-        p.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.SmoothPixmapTransform)
-        bg = QtGui.QColor(15, 17, 20, 210)
-        p.setPen(QtGui.QPen(QtGui.QColor(0, 0, 0, 150), 1))
-        p.setBrush(bg)
+    def invalidate(self):
+        """字体等变化后调用，下次绘制时重建缓存"""
+        self._chrome = None
+        self._text = None
+
+    def _build_chrome(self, w, h, dpr, font):
         rect = QtCore.QRectF(1.0, 1.0, w - 2.0, h - 2.0)
         r = h / 2.0
+
+        background = QtGui.QPixmap(max(1, int(w * dpr)), max(1, int(h * dpr)))
+        background.setDevicePixelRatio(dpr)
+        background.fill(QtCore.Qt.transparent)
+        p = QtGui.QPainter(background)
+        p.setRenderHints(QtGui.QPainter.Antialiasing)
+        p.setPen(QtGui.QPen(QtGui.QColor(0, 0, 0, 150), 1))
+        p.setBrush(QtGui.QColor(15, 17, 20, 210))
         p.drawRoundedRect(rect, r, r)
-        ratio = self.value / 100.0
-        fill_w = max(0.0, (w - 2.0) * ratio)
+        p.end()
+
         if self.team == "red":
             c1, c2, txt = QtGui.QColor(255, 84, 84), QtGui.QColor(210, 50, 50), QtGui.QColor(255, 240, 240)
         elif self.team == "blue":
@@ -207,15 +582,78 @@ class HealthBar(QtWidgets.QFrame):  # 血条
         grad = QtGui.QLinearGradient(0, 0, w, 0)
         grad.setColorAt(0.0, QtGui.QColor(c1.red(), c1.green(), c1.blue(), 240))
         grad.setColorAt(1.0, QtGui.QColor(c2.red(), c2.green(), c2.blue(), 240))
-        p.setPen(QtCore.Qt.NoPen)
-        p.setBrush(QtGui.QBrush(grad))
-        p.drawRoundedRect(QtCore.QRectF(1.0, 1.0, fill_w, h - 2.0), r, r)
-        base_font = QtGui.QFont(self.window().font())
+
+        base_font = QtGui.QFont(font)
         base_font.setBold(True)
         base_font.setPointSize(max(14, int(h * 0.50)))
-        p.setFont(base_font)
-        p.setPen(QtGui.QPen(txt, 1))
-        p.drawText(rect, QtCore.Qt.AlignCenter, f"{self.label_text} {self.value:3d}")
+
+        return {"key": (w, h, dpr), "rect": rect, "radius": r, "background": background,
+                "brush": QtGui.QBrush(grad), "font": base_font, "pen": QtGui.QPen(txt, 1)}
+
+    def paint(self, p: QtGui.QPainter, rect: QtCore.QRect, dpr: float, font: QtGui.QFont):
+        """画在rect内，font为窗口字体；会改动画笔、画刷、字体和渲染选项"""
+        w, h = rect.width(), rect.height()
+        chrome = self._chrome
+        if chrome is None or chrome["key"] != (w, h, dpr):
+            chrome = self._chrome = self._build_chrome(w, h, dpr, font)
+            self._text = None
+        origin = QtCore.QPointF(rect.topLeft())
+        p.translate(origin)
+        p.drawPixmap(0, 0, chrome["background"])
+
+        r = chrome["radius"]
+        fill_w = max(0.0, (w - 2.0) * self.value / 100.0)
+        p.setRenderHints(QtGui.QPainter.Antialiasing)
+        p.setPen(QtCore.Qt.NoPen)
+        p.setBrush(chrome["brush"])
+        p.drawRoundedRect(QtCore.QRectF(1.0, 1.0, fill_w, h - 2.0), r, r)
+
+        if self._text is None:
+            self._text = QtGui.QStaticText(f"{self.label_text} {self.value:3d}")
+            self._text.setTextFormat(QtCore.Qt.PlainText)
+            self._text.prepare(QtGui.QTransform(), chrome["font"])
+        p.setFont(chrome["font"])
+        p.setPen(chrome["pen"])
+        size = self._text.size()
+        text_rect = chrome["rect"]
+        p.drawStaticText(QtCore.QPointF(text_rect.center().x() - size.width() / 2,
+                                        text_rect.center().y() - size.height() / 2), self._text)
+        p.translate(-origin)
+
+
+class HealthBar(QtWidgets.QFrame):  # 血条
+    def __init__(self, parent=None, label_text="HP", team=None, height=64):
+        super().__init__(parent)
+        self.setObjectName("healthBar")
+        self.setFixedHeight(height)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        self.bar = HealthBarPainter(label_text, team)
+
+    @property
+    def value(self) -> int:
+        return self.bar.value
+
+    @property
+    def team(self) -> str | None:
+        return self.bar.team
+
+    def set_value(self, value: int):
+        if self.bar.set_value(value):
+            self.update()
+
+    def set_color(self, team: str | None):
+        if self.bar.set_color(team):
+            self.update()
+
+    def changeEvent(self, e):
+        if e.type() in (QtCore.QEvent.FontChange, QtCore.QEvent.ParentChange):
+            self.bar.invalidate()
+        super().changeEvent(e)
+
+    @PROFILER.profile("HealthBar.paintEvent")
+    def paintEvent(self, e):
+        p = QtGui.QPainter(self)
+        self.bar.paint(p, self.rect(), self.devicePixelRatioF(), self.window().font())
         p.end()
 
 
@@ -233,6 +671,7 @@ class CountdownBanner(QtWidgets.QFrame):  # 倒计时
         f.setPointSize(28)
         self.label.setFont(f)
         self.label.setStyleSheet("color: rgb(255,100,100); letter-spacing: 1px; margin:0px;")
+        self._warning = True
         lay.addWidget(self.label)
 
         font_metrics = QtGui.QFontMetrics(self.label.font())
@@ -240,9 +679,13 @@ class CountdownBanner(QtWidgets.QFrame):  # 倒计时
         self.label.setFixedWidth(max_text_width + 10)
 
     def set_text(self, txt):
-        self.label.setText(txt)
+        if txt != self.label.text():
+            self.label.setText(txt)
 
     def set_warning(self, warn: bool):
+        if warn == self._warning:  # 换样式表会重新polish，只在切换时换
+            return
+        self._warning = warn
         self.label.setStyleSheet(
             "color: rgb(255,100,100); letter-spacing: 1px; margin:0px;"
             if warn
@@ -250,6 +693,398 @@ class CountdownBanner(QtWidgets.QFrame):  # 倒计时
         )
 
 
+def bottom_panel_geometry(W, H, text_w, line_h, extra_h=0) -> QtCore.QRect:
+    """左下状态面板的位置：宽度跟随状态栏文字，extra_h为延迟统计行占的高度"""
+    min_inner = 360
+    max_inner = int(W * 0.40)
+    target_inner_w = max(min_inner, min(max_inner, text_w))
+    bl_w = target_inner_w + 20  # 左右边距
+
+    bl_h = max(int(H * 0.11), 86) + extra_h
+    bl_x = int(W * 0.028)
+    bl_y = max(0, H - bl_h - int(H * 0.060) - line_h)
+    return QtCore.QRect(bl_x, bl_y, bl_w, bl_h)
+
+
+class HudLayer(QtWidgets.QWidget):  # 单层HUD：队名、血条、倒计时和状态栏在一个paintEvent里画完
+    """替代topHud和bottomPanel两棵控件树，外观相同
+
+    文字都缓存为QStaticText，数值变化时只重建变了的那一段并标脏对应区域，
+    没有样式表重新polish，也没有布局计算；位置只在尺寸或状态栏宽度变化时重算。
+    """
+
+    TEAM_BAR_HEIGHT = 48
+    SELF_BAR_HEIGHT = 26
+    MAX_GLYPHS = 256  # 状态栏文字段缓存上限
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(QtCore.Qt.WA_NoSystemBackground)
+
+        self.red_name = "红方队伍"
+        self.blue_name = "蓝方队伍"
+        self.countdown = "0:00"
+        self.warning = True
+        self.red_bar = HealthBarPainter("红方", "red")
+        self.blue_bar = HealthBarPainter("蓝方", "blue")
+        self.self_bar = HealthBarPainter("我方", None)
+        self._status = ([], [], None)  # 前两行的分段和延迟统计行（None为不显示）
+        self._bottom_visible = True
+
+        self._fonts = None  # 字体和度量，窗口字体变化时重建
+        self._glyphs = {}  # (字体序号, 文字) -> QStaticText
+        self._texts = {}  # 队名和倒计时的QStaticText
+        self._lines = None  # 状态栏各行 [(x偏移, QStaticText, QColor)]，宽度
+        self._colors = {None: QtGui.QColor(255, 255, 255)}
+        self._rects = None  # 各元素的位置
+        self._backgrounds = {}  # 倒计时和面板的底板
+
+        self._red_name_color = QtGui.QColor("#ff6b6b")
+        self._blue_name_color = QtGui.QColor("#6ea8ff")
+        self._banner_brush = QtGui.QColor(0, 0, 0, 89)
+        self._panel_brush = QtGui.QColor(0, 0, 0, 77)
+        self._latency_color = QtGui.QColor(255, 255, 255, 191)
+
+    # ---- 状态 ----
+
+    def set_red_name(self, name: str):
+        if name != self.red_name:
+            self.red_name = name
+            self._texts.pop("red_name", None)
+            self._update_rect("red_name")
+
+    def set_blue_name(self, name: str):
+        if name != self.blue_name:
+            self.blue_name = name
+            self._texts.pop("blue_name", None)
+            self._update_rect("blue_name")
+
+    def set_red_hp(self, hp: int):
+        if self.red_bar.set_value(hp):
+            self._update_rect("red_bar")
+
+    def set_blue_hp(self, hp: int):
+        if self.blue_bar.set_value(hp):
+            self._update_rect("blue_bar")
+
+    def set_self_hp(self, hp: int):
+        if self.self_bar.set_value(hp):
+            self._update_rect("self_bar")
+
+    def set_color(self, team: str | None):
+        if self.self_bar.set_color(team):
+            self._update_rect("self_bar")
+
+    def set_countdown(self, text: str, warn: bool):
+        if text == self.countdown and warn == self.warning:
+            return
+        if text != self.countdown:
+            self.countdown = text
+            self._texts.pop("countdown", None)
+        self.warning = warn
+        self._update_rect("banner")
+
+    def set_status(self, line1: list, line2: list, line3: str | None):
+        """line1、line2为[(文字, 颜色或None)]，line3为延迟统计行，None时不显示"""
+        old, status = self._status, (line1, line2, line3)
+        if status == old:
+            return
+        if line3 != old[2]:
+            self._texts.pop("line3", None)
+        self._status = status
+        self._lines = None
+        if self._rects is None:
+            return
+        if self._panel_key() != self._rects["panel_key"]:  # 面板尺寸跟随文字宽度和行数
+            old_panel = self._rects["panel"]
+            self._rects = None
+            self.update(old_panel | self._layout()["panel"])
+            return
+        for name, a, b in zip(("line1", "line2", "line3"), old, status):
+            if a != b:
+                self.update(self._rects[name])
+
+    def set_bottom_visible(self, visible: bool):
+        if visible != self._bottom_visible:
+            self._bottom_visible = visible
+            self._update_rect("panel")
+
+    # ---- 布局与缓存 ----
+
+    def resizeEvent(self, e):
+        self._rects = None
+        super().resizeEvent(e)
+
+    def changeEvent(self, e):
+        if e.type() in (QtCore.QEvent.FontChange, QtCore.QEvent.ParentChange):
+            self._fonts = None
+            self._rects = None
+            self._glyphs.clear()
+            self._texts.clear()
+            self._lines = None
+            self._backgrounds.clear()
+            for bar in (self.red_bar, self.blue_bar, self.self_bar):
+                bar.invalidate()
+        super().changeEvent(e)
+
+    def _update_rect(self, name):
+        if self._rects is not None:
+            self.update(self._rects[name])
+
+    def _get_fonts(self):
+        if self._fonts is None:
+            base = self.window().font()
+            team = QtGui.QFont(base)
+            team.setBold(True)
+            team.setPointSize(20)
+            countdown = QtGui.QFont(base)
+            countdown.setBold(True)
+            countdown.setPointSize(28)
+            countdown.setLetterSpacing(QtGui.QFont.AbsoluteSpacing, 1)
+            status = QtGui.QFont(base)
+            status.setPointSize(13)
+            latency = QtGui.QFont(base)
+            latency.setPointSize(11)
+            fonts = (team, countdown, status, latency)
+            self._fonts = fonts, tuple(QtGui.QFontMetrics(f) for f in fonts)
+        return self._fonts
+
+    def _static_text(self, text, font):
+        st = QtGui.QStaticText(text)
+        st.setTextFormat(QtCore.Qt.PlainText)
+        st.prepare(QtGui.QTransform(), font)
+        return st
+
+    def _text(self, key, text, font):
+        st = self._texts.get(key)
+        if st is None:
+            st = self._texts[key] = self._static_text(text, font)
+        return st
+
+    def _get_lines(self):
+        """状态栏各行的文字段及其相对行首的偏移，只在内容变化后重建"""
+        if self._lines is None:
+            (_, _, font, _), (_, _, fm, _) = self._get_fonts()
+            if len(self._glyphs) > self.MAX_GLYPHS:
+                self._glyphs.clear()
+            lines = []
+            for segments in self._status[:2]:
+                runs, x = [], 0
+                for text, color in segments:
+                    st = self._glyphs.get(text)
+                    if st is None:
+                        st = self._glyphs[text] = self._static_text(text, font)
+                    qcolor = self._colors.get(color)
+                    if qcolor is None:
+                        qcolor = self._colors[color] = QtGui.QColor(color)
+                    runs.append((x, st, qcolor))
+                    x += fm.horizontalAdvance(text)
+                lines.append((runs, x))
+            self._lines = lines
+        return self._lines
+
+    @staticmethod
+    def _label_height(fm, text):
+        """与QLabel.sizeHint的高度一致"""
+        return fm.boundingRect(QtCore.QRect(0, 0, 2000, 2000), QtCore.Qt.AlignCenter, text).height()
+
+    def _panel_key(self):
+        """决定左下面板尺寸的量：状态栏文字宽度和是否有延迟统计行"""
+        return max(width for _, width in self._get_lines()) + 18, self._status[2] is not None
+
+    def _background(self, name, rect, radius, color):
+        """圆角半透明底板，按尺寸缓存为QPixmap"""
+        key = (rect.size(), self.devicePixelRatioF())
+        cached = self._backgrounds.get(name)
+        if cached is None or cached[0] != key:
+            size, dpr = key
+            pixmap = QtGui.QPixmap(max(1, int(size.width() * dpr)), max(1, int(size.height() * dpr)))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(QtCore.Qt.transparent)
+            p = QtGui.QPainter(pixmap)
+            p.setRenderHints(QtGui.QPainter.Antialiasing)
+            p.setPen(QtCore.Qt.NoPen)
+            p.setBrush(color)
+            p.drawRoundedRect(QtCore.QRectF(0, 0, size.width(), size.height()), radius, radius)
+            p.end()
+            cached = self._backgrounds[name] = (key, pixmap)
+        return cached[1]
+
+    def _layout(self):
+        """与UIBase.resizeEvent和_update_bottom_panel_layout中控件的位置一致"""
+        if self._rects is not None:
+            return self._rects
+        W, H = self.width(), self.height()
+        _, (fm_team, fm_countdown, fm_status, fm_latency) = self._get_fonts()
+        rects = {}
+
+        # 顶部：倒计时居中，两侧队名和血条
+        top_y = int(H * 0.020)
+        top_h = int(H * 0.12)
+        inner_w = W - int(W * 0.035) * 2 - int(W * 0.010) * 2
+        banner_w = fm_countdown.horizontalAdvance("-00:00") + 10 + 52
+        banner_h = self._label_height(fm_countdown, self.countdown) + 28
+        rects["banner"] = QtCore.QRect((W - banner_w + 1) // 2, top_y + (top_h - banner_h) // 2, banner_w, banner_h)
+
+        gap = 32  # 布局间距加固定间隔
+        free = inner_w - banner_w - 24 - 20 * 6
+        team_w = max(260, min(int(W * 0.22), free // 3))
+        name_h = self._label_height(fm_team, self.red_name)
+        banner_x = rects["banner"].x()
+        for side, x in (("red", banner_x - gap - team_w), ("blue", banner_x + banner_w + gap)):
+            rects[f"{side}_name"] = QtCore.QRect(x, top_y, team_w, name_h)
+            rects[f"{side}_bar"] = QtCore.QRect(x, top_y + name_h + 2, team_w, self.TEAM_BAR_HEIGHT)
+
+        # 左下：我方血条和状态栏
+        text_w, line3 = rects["panel_key"] = self._panel_key()
+        panel = bottom_panel_geometry(W, H, text_w, fm_status.height(),
+                                      fm_latency.height() + 4 if line3 else 0)
+        rects["panel"] = panel
+        inner = panel.adjusted(10, 6, -10, -6)
+        rows = [self.SELF_BAR_HEIGHT, fm_status.height(), fm_status.height()]
+        if line3:
+            rows.append(fm_latency.height())
+        spare = max(0, inner.height() - sum(rows) - 4 * (len(rows) - 1)) / (len(rows) + 1)  # 多余高度均分到行间和上下
+        y = inner.top() + spare
+        for name, row_h in zip(("self_bar", "line1", "line2", "line3"), rows):
+            rects[name] = QtCore.QRect(inner.left(), int(y), inner.width(), row_h)
+            y += row_h + 4 + spare
+        self._rects = rects
+        return rects
+
+    # ---- 绘制 ----
+
+    @PROFILER.profile("HudLayer.paintEvent")
+    def paintEvent(self, e):
+        rects = self._layout()
+        (f_team, f_countdown, f_status, f_latency), _ = self._get_fonts()
+        dirty = e.region()
+        dpr = self.devicePixelRatioF()
+        base_font = self.window().font()
+        p = QtGui.QPainter(self)
+
+        for side, color, name in (("red", self._red_name_color, self.red_name),
+                                  ("blue", self._blue_name_color, self.blue_name)):
+            rect = rects[f"{side}_name"]
+            if dirty.intersects(rect):
+                st = self._text(f"{side}_name", name, f_team)
+                p.setFont(f_team)
+                p.setPen(color)
+                size = st.size()
+                p.drawStaticText(QtCore.QPointF(rect.center().x() - size.width() / 2, rect.top()), st)
+        if dirty.intersects(rects["red_bar"]):
+            self.red_bar.paint(p, rects["red_bar"], dpr, base_font)
+        if dirty.intersects(rects["blue_bar"]):
+            self.blue_bar.paint(p, rects["blue_bar"], dpr, base_font)
+
+        rect = rects["banner"]
+        if dirty.intersects(rect):
+            p.drawPixmap(rect.topLeft(), self._background("banner", rect, 14, self._banner_brush))
+            st = self._text("countdown", self.countdown, f_countdown)
+            p.setFont(f_countdown)
+            p.setPen(QtGui.QColor(255, 100, 100) if self.warning else QtGui.QColor("#f5f7fa"))
+            size = st.size()
+            p.drawStaticText(QtCore.QPointF(rect.center().x() - size.width() / 2,
+                                            rect.center().y() - size.height() / 2), st)
+
+        panel = rects["panel"]
+        if self._bottom_visible and dirty.intersects(panel):
+            p.drawPixmap(panel.topLeft(), self._background("panel", panel, 10, self._panel_brush))
+            if dirty.intersects(rects["self_bar"]):
+                self.self_bar.paint(p, rects["self_bar"], dpr, base_font)
+
+            p.setFont(f_status)
+            for (runs, width), name in zip(self._get_lines(), ("line1", "line2")):
+                rect = rects[name]
+                if not dirty.intersects(rect):
+                    continue
+                x0 = rect.left() + (rect.width() - width) / 2
+                for x, st, color in runs:
+                    p.setPen(color)
+                    p.drawStaticText(QtCore.QPointF(x0 + x, rect.top()), st)
+            if self._status[2] is not None and dirty.intersects(rects["line3"]):
+                rect = rects["line3"]
+                st = self._text("line3", self._status[2], f_latency)
+                p.setFont(f_latency)
+                p.setPen(self._latency_color)
+                p.drawStaticText(QtCore.QPointF(rect.center().x() - st.size().width() / 2, rect.top()), st)
+        p.end()
+
+
+class ProfilerOverlay(QtWidgets.QWidget):  # 性能分析叠加层：各段耗时的p50/p99条形图，F3开关
+    """条长按刷新周期（一帧的预算）缩放，竖线为预算位置，p99超出预算的行标红"""
+
+    ROW_HEIGHT = 22
+    NAME_WIDTH = 190
+    BAR_WIDTH = 160
+
+    def __init__(self, frame_clock, parent=None):
+        super().__init__(parent)
+        self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self._frame_clock = frame_clock
+        self._summary = {}
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(500)
+        self._timer.timeout.connect(self._refresh)
+
+        f = QtGui.QFont(self.font())
+        f.setPointSize(10)
+        self.setFont(f)
+        self._background = QtGui.QColor(0, 0, 0, 170)
+        self._p50_color = QtGui.QColor(120, 200, 255)
+        self._p99_color = QtGui.QColor(120, 200, 255, 90)
+        self._over_color = QtGui.QColor(255, 90, 90)
+        self._budget_pen = QtGui.QPen(QtGui.QColor(255, 209, 102), 1)
+        self._text_color = QtGui.QColor(235, 235, 235)
+
+    def showEvent(self, e):
+        self._refresh()
+        self._timer.start()
+        super().showEvent(e)
+
+    def hideEvent(self, e):
+        self._timer.stop()
+        super().hideEvent(e)
+
+    def _refresh(self):
+        self._summary = dict(PROFILER.summary())
+        height = self.ROW_HEIGHT * (len(self._summary) + 1) + 12
+        if height != self.height():
+            self.resize(self.NAME_WIDTH + self.BAR_WIDTH + 220, height)
+        self.update()
+
+    def paintEvent(self, e):
+        budget = self._frame_clock.interval * 1000
+        scale = self.BAR_WIDTH / (budget * 1.5)  # 条长上限为1.5倍预算
+        fm = self.fontMetrics()
+        row_h = self.ROW_HEIGHT
+        bar_x = 8 + self.NAME_WIDTH
+        text_dy = (row_h - fm.height()) / 2 + fm.ascent()
+
+        p = QtGui.QPainter(self)
+        p.fillRect(self.rect(), self._background)
+        p.setPen(self._text_color)
+        p.drawText(QtCore.QPointF(8, 6 + text_dy),
+                   f"性能分析 (F3关闭)  预算 {budget:.1f} ms  最近{PROFILER.window_seconds:.0f}秒 p50/p99")
+
+        for i, (name, (p50, p99, peak, rate)) in enumerate(self._summary.items(), 1):
+            y = 6 + i * row_h
+            over = p99 > budget
+            p.setPen(self._over_color if over else self._text_color)
+            p.drawText(QtCore.QPointF(8, y + text_dy), fm.elidedText(name, QtCore.Qt.ElideMiddle, self.NAME_WIDTH - 8))
+            p.fillRect(QtCore.QRectF(bar_x, y + 4, min(self.BAR_WIDTH, p99 * scale), row_h - 8), self._p99_color)
+            p.fillRect(QtCore.QRectF(bar_x, y + 4, min(self.BAR_WIDTH, p50 * scale), row_h - 8),
+                       self._over_color if over else self._p50_color)
+            p.drawText(QtCore.QPointF(bar_x + self.BAR_WIDTH + 8, y + text_dy),
+                       f"{p50:.2f}/{p99:.2f} ms 最大{peak:.1f} {rate:.0f}/s")
+
+        p.setPen(self._budget_pen)
+        budget_x = bar_x + budget * scale
+        p.drawLine(QtCore.QPointF(budget_x, 6 + row_h), QtCore.QPointF(budget_x, self.height() - 6))
+        p.end()
+
+
 class ToggleSwitch(QtWidgets.QCheckBox):
     def __init__(self, parent=None, bg_color="#777", circle_color="#FFF", active_color="#3478F6"):
         super().__init__(parent)
@@ -306,6 +1141,104 @@ class ToggleSwitch(QtWidgets.QCheckBox):
         return super().mousePressEvent(e)
 
 
+class FrameClock(QtCore.QObject):  # 按显示器刷新节拍发出tick，界面只在tick里更新，每个刷新周期最多绘制一次
+    """由窗口的requestUpdate驱动（支持的平台上与垂直同步对齐）
+
+    有的平台requestUpdate只是一个5ms的定时器，测出节拍明显快于屏幕刷新率时，
+    改用按刷新周期累加截止时间的精确定时器，平均间隔与刷新率一致。
+    """
+
+    tick = QtCore.Signal()
+
+    PROBE_FRAMES = 30  # 测量requestUpdate节拍的帧数
+
+    def __init__(self, widget, level=logging.WARNING):
+        super().__init__(widget)
+
+        self.logger = logging.getLogger("FrameClock")
+        self.logger.setLevel(level)
+
+        self._widget = widget
+        self._window = None
+        self._interval = 1 / 60  # 刷新周期（秒），随所在屏幕更新
+        self._probe = []  # 启动后最初若干次UpdateRequest的时间
+        self._requested = False  # 已调用requestUpdate，对应的UpdateRequest还没收到
+        self._last_tick = 0.0
+        self._deadline = 0.0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timer)
+
+    def start(self):
+        """窗口显示后调用，重复调用无副作用"""
+        window = self._widget.windowHandle()
+        if window is None or window is self._window:
+            return
+        self._window = window
+        window.installEventFilter(self)
+        window.screenChanged.connect(self._update_interval)
+        self._update_interval(window.screen())
+        self._probe = []
+        self._request()
+
+    @property
+    def interval(self) -> float:
+        """刷新周期（秒）"""
+        return self._interval
+
+    def _update_interval(self, screen):
+        rate = screen.refreshRate() if screen is not None else 0
+        self._interval = 1 / rate if rate >= 20 else 1 / 60
+        self.logger.info(f"屏幕刷新率 {1 / self._interval:.1f} Hz")
+
+    def _request(self):
+        self._requested = True
+        self._window.requestUpdate()
+
+    def eventFilter(self, obj, e):
+        # 只拦截自己请求的那次UpdateRequest，其他来源的（如窗口暴露、缩放）照常交给窗口
+        if obj is self._window and e.type() == QtCore.QEvent.UpdateRequest and self._requested:
+            self._requested = False
+            now = time.perf_counter()
+            if len(self._probe) < self.PROBE_FRAMES:
+                self._probe.append(now)
+                if len(self._probe) == self.PROBE_FRAMES and self._probe_is_timer():
+                    self._start_timer(now)
+                    return True
+            if now - self._last_tick >= self._interval * 0.5:  # 探测期间也不超过刷新率
+                self._last_tick = now
+                PROFILER.lateness("FrameClock迟到", self._interval)
+                self.tick.emit()
+            self._request()
+            # 不交给窗口处理：QWidgetWindow收到UpdateRequest会重绘整个窗口；
+            # tick里标脏的区域由控件自己的UpdateRequest画出来
+            return True
+        return False
+
+    def _probe_is_timer(self) -> bool:
+        intervals = sorted(b - a for a, b in zip(self._probe, self._probe[1:]))
+        median = intervals[len(intervals) // 2]
+        if median < self._interval * 0.6:
+            self.logger.info(f"requestUpdate间隔 {median * 1000:.1f} ms，未与刷新同步，改用定时器")
+            return True
+        return False
+
+    def _start_timer(self, now):
+        self._deadline = now
+        self._on_timer()
+
+    def _on_timer(self):
+        now = time.perf_counter()
+        self._deadline += self._interval
+        if self._deadline < now:  # 界面线程卡顿过，不补发
+            self._deadline = now + self._interval
+        self._timer.start(max(0, int((self._deadline - now) * 1000)))
+        self._last_tick = now
+        PROFILER.lateness("FrameClock迟到", self._interval)
+        self.tick.emit()
+
+
 class UIBase(QtWidgets.QMainWindow):
     def __init__(self, level=logging.WARNING):
         self.app = QtWidgets.QApplication(sys.argv)
@@ -316,6 +1249,8 @@ class UIBase(QtWidgets.QMainWindow):
         self.logger = logging.getLogger("UI")
         self.logger.setLevel(level)
 
+        self.frame_clock = FrameClock(self, level)  # 显示刷新节拍，外部在tick里更新界面
+
         self.setWindowTitle("RoboMaster校内赛选手端")
 
         scr = QtWidgets.QApplication.primaryScreen().availableGeometry()
@@ -331,10 +1266,15 @@ class UIBase(QtWidgets.QMainWindow):
         lay = QtWidgets.QVBoxLayout(central)
         lay.setContentsMargins(0, 0, 0, 0)
         lay.setSpacing(0)
-        self.bg_label = QtWidgets.QLabel(objectName="bgLabel")
+        self.video_stack = QtWidgets.QStackedWidget(objectName="videoStack")
+        lay.addWidget(self.video_stack)
+        self.bg_label = VideoLabel(objectName="bgLabel")
         self.bg_label.setAlignment(QtCore.Qt.AlignCenter)
         self.bg_label.setScaledContents(False)
-        lay.addWidget(self.bg_label)
+        self.video_stack.addWidget(self.bg_label)
+        self.video_surface = None  # OpenGL视频画面，启用时替换bg_label
+        self._painting_frame = None  # 已交给画面、等待绘制完成的帧（延迟统计）
+        self.bg_label.painted.connect(self._on_video_painted)
 
         self.overlay = Overlay(self.bg_label)
         self.overlay.setGeometry(0, 0, self.screen_size.width(), self.screen_size.height())
@@ -388,6 +1328,11 @@ class UIBase(QtWidgets.QMainWindow):
         self.settings_btn.clicked.connect(self._open_menu)
         self._style_buttons_font()
 
+        self.pip_label = VideoLabel(parent=self, objectName="pipLabel")  # 画中画副视频流
+        self.pip_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.pip_label.hide()
+        self._pip_seq = None
+
         self.bottom_left_panel = QtWidgets.QFrame(self, objectName="bottomPanel")
         bl = QtWidgets.QVBoxLayout(self.bottom_left_panel)
         bl.setContentsMargins(10, 6, 10, 6)
@@ -396,28 +1341,36 @@ class UIBase(QtWidgets.QMainWindow):
         self.self_bar.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
         bl.addWidget(self.self_bar)
 
-        self.status_label1 = QtWidgets.QLabel("", objectName="statusBar")
+        self.status_label1 = StatusLine(objectName="statusBar")
         f2 = QtGui.QFont(self.font_main)
         f2.setPointSize(13)
         self.status_label1.setFont(f2)
-        self.status_label1.setTextFormat(QtCore.Qt.RichText)
-        self.status_label1.setStyleSheet("margin:0px; padding:0px;")
-        self.status_label1.setWordWrap(False)
-        self.status_label1.setAlignment(QtCore.Qt.AlignCenter)
-        self.status_label1.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
         bl.addWidget(self.status_label1)
 
-        self.status_label2 = QtWidgets.QLabel("", objectName="armorBar")
+        self.status_label2 = StatusLine(objectName="armorBar")
         f3 = QtGui.QFont(self.font_main)
         f3.setPointSize(13)
         self.status_label2.setFont(f3)
-        self.status_label2.setTextFormat(QtCore.Qt.RichText)
-        self.status_label2.setStyleSheet("margin:0px; padding:0px;")
-        self.status_label2.setWordWrap(False)
-        self.status_label2.setAlignment(QtCore.Qt.AlignCenter)
-        self.status_label2.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
         bl.addWidget(self.status_label2)
 
+        self.status_label3 = QtWidgets.QLabel("", objectName="latencyBar")  # 视频延迟统计，默认隐藏
+        f4 = QtGui.QFont(self.font_main)
+        f4.setPointSize(11)
+        self.status_label3.setFont(f4)
+        self.status_label3.setTextFormat(QtCore.Qt.PlainText)
+        self.status_label3.setStyleSheet("margin:0px; padding:0px; color: rgba(255,255,255,0.75);")
+        self.status_label3.setWordWrap(False)
+        self.status_label3.setAlignment(QtCore.Qt.AlignCenter)
+        self.status_label3.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        self.status_label3.hide()
+        bl.addWidget(self.status_label3)
+
+        self.hud_layer = HudLayer(self)  # 单层绘制HUD，启用时替代top_hud和bottom_left_panel
+        self.hud_layer.hide()
+
+        self.profiler_overlay = ProfilerOverlay(self.frame_clock, self)  # F3开关
+        self.profiler_overlay.hide()
+
         self.menu_mask = QtWidgets.QWidget(self, objectName="menuMask")
         self.menu_mask.hide()
         self.menu_mask.mousePressEvent = lambda e: self._cancel_menu()
@@ -434,14 +1387,30 @@ class UIBase(QtWidgets.QMainWindow):
 
         self.uart_connect_state = False
         self.video_fps = None
+        self.video_dropped = None  # 最近1秒为追帧丢弃的数量
+        self.video_stalled = False
+        self.video_latency = None
+        self.video_reconnect = None  # 最近一次重连的出图耗时（秒）
+        self.video_jitter = None  # 平滑缓冲开启时为(当前缓冲帧数, 增加的延迟ms)
+        self.recording_state = None  # 录制中时为(已完成段数, 丢弃段数)
         self.mqtt_freq = None
         self.tx_rssi = None
         self.rx_rssi = None
+        self._status_scheduled = False
 
         self.serial_port = None
         self.video_source = self.video_edit.text().strip()
+        self.pip_source = self.pip_edit.text().strip()
+        self.video_profile = self.profile_combo.currentData()
+        self.decode_threads = self.decode_combo.currentData()
+        self.jitter_buffer = self.jitter_combo.currentData()
+        self.decode_mode = None
         self.mqtt_url = self.server_edit.text().strip()
         self.big_screen_mode = False
+        self.opengl_video = False
+        self.show_latency = False
+        self.recording = False
+        self.painted_hud = False
 
         self._update_status()
         self._update_ui_for_big_screen_mode()
@@ -488,18 +1457,34 @@ class UIBase(QtWidgets.QMainWindow):
         self._refresh_serial_ports()
 
         self.video_edit.setText(self.video_source or "")
+        self.pip_edit.setText(self.pip_source or "")
+        self.profile_combo.setCurrentIndex(max(0, self.profile_combo.findData(self.video_profile)))
+        self.decode_combo.setCurrentIndex(max(0, self.decode_combo.findData(self.decode_threads)))
+        self.jitter_combo.setCurrentIndex(max(0, self.jitter_combo.findData(self.jitter_buffer)))
         self.server_edit.setText(self.mqtt_url or "")
         if self.serial_port:
             idx = self.serial_combo.findData(self.serial_port)
             if idx >= 0:
                 self.serial_combo.setCurrentIndex(idx)
         self.big_screen_mode_check.setChecked(self.big_screen_mode)
+        self.opengl_video_check.setChecked(self.opengl_video)
+        self.show_latency_check.setChecked(self.show_latency)
+        self.recording_check.setChecked(self.recording)
+        self.painted_hud_check.setChecked(self.painted_hud)
 
         self._menu_snapshot = {
             "serial_index": self.serial_combo.currentIndex() if hasattr(self, "serial_combo") else 0,
             "video": self.video_edit.text() if hasattr(self, "video_edit") else "",
+            "pip": self.pip_edit.text(),
+            "profile_index": self.profile_combo.currentIndex(),
+            "decode_index": self.decode_combo.currentIndex(),
+            "jitter_index": self.jitter_combo.currentIndex(),
             "server": self.server_edit.text() if hasattr(self, "server_edit") else "",
             "big_screen_mode": self.big_screen_mode_check.isChecked(),
+            "opengl_video": self.opengl_video_check.isChecked(),
+            "show_latency": self.show_latency_check.isChecked(),
+            "recording": self.recording_check.isChecked(),
+            "painted_hud": self.painted_hud_check.isChecked(),
         }
         self._center_menu()
         self.menu_mask.setGeometry(0, 0, self.width(), self.height())
@@ -514,10 +1499,23 @@ class UIBase(QtWidgets.QMainWindow):
                             if data and str(data).strip().upper() != "NA"
                             else None)
         self.video_source = self.video_edit.text().strip()
+        self.pip_source = self.pip_edit.text().strip()
+        self.video_profile = self.profile_combo.currentData()
+        self.decode_threads = self.decode_combo.currentData()
+        self.jitter_buffer = self.jitter_combo.currentData()
         self.mqtt_url = self.server_edit.text().strip()
         self.big_screen_mode = self.big_screen_mode_check.isChecked()
+        self.opengl_video = self.opengl_video_check.isChecked()
+        self.show_latency = self.show_latency_check.isChecked()
+        self.recording = self.recording_check.isChecked()
+        self.painted_hud = self.painted_hud_check.isChecked()
 
+        self._update_hud_mode()
         self._update_ui_for_big_screen_mode()
+        self._update_video_surface()
+        self.status_label3.setVisible(self.show_latency)
+        self._update_bottom_panel_layout()  # 面板高度随第三行显示与否变化，文字没变时_update_status不会重新布局
+        self._update_status()
 
         self._menu_snapshot = None
         self.menu_panel.hide()
@@ -531,8 +1529,16 @@ class UIBase(QtWidgets.QMainWindow):
             except Exception:
                 pass
             self.video_edit.setText(snap["video"])
+            self.pip_edit.setText(snap["pip"])
+            self.profile_combo.setCurrentIndex(snap["profile_index"])
+            self.decode_combo.setCurrentIndex(snap["decode_index"])
+            self.jitter_combo.setCurrentIndex(snap["jitter_index"])
             self.server_edit.setText(snap["server"])
             self.big_screen_mode_check.setChecked(snap["big_screen_mode"])
+            self.opengl_video_check.setChecked(snap["opengl_video"])
+            self.show_latency_check.setChecked(snap["show_latency"])
+            self.recording_check.setChecked(snap["recording"])
+            self.painted_hud_check.setChecked(snap["painted_hud"])
         self._menu_snapshot = None
         self.menu_panel.hide()
         self.menu_mask.hide()
@@ -589,6 +1595,69 @@ class UIBase(QtWidgets.QMainWindow):
         r2.addWidget(self.video_edit, 1)
         layout.addWidget(row2)
 
+        row_pip = QtWidgets.QWidget()
+        rpp = QtWidgets.QHBoxLayout(row_pip)
+        rpp.setContentsMargins(0, 0, 0, 0)
+        rpp.setSpacing(10)
+        lpp = QtWidgets.QLabel("副视频流")
+        lpp.setFixedWidth(label_w)
+        lpp.setFont(self._font_scaled(0.022))
+        self.pip_edit = QtWidgets.QLineEdit(objectName="pipEdit")
+        self.pip_edit.setFont(self._font_scaled(0.022))
+        self.pip_edit.setPlaceholderText("留空关闭画中画")
+        rpp.addWidget(lpp)
+        rpp.addWidget(self.pip_edit, 1)
+        layout.addWidget(row_pip)
+
+        row_profile = QtWidgets.QWidget()
+        rp = QtWidgets.QHBoxLayout(row_profile)
+        rp.setContentsMargins(0, 0, 0, 0)
+        rp.setSpacing(10)
+        lp = QtWidgets.QLabel("延迟模式")
+        lp.setFixedWidth(label_w)
+        lp.setFont(self._font_scaled(0.022))
+        self.profile_combo = QtWidgets.QComboBox(objectName="profileCombo")
+        self.profile_combo.setFont(self._font_scaled(0.022))
+        for label, profile in VIDEO_PROFILES:
+            self.profile_combo.addItem(label, profile)
+        self.profile_combo.setCurrentIndex(self.profile_combo.findData(DEFAULT_VIDEO_PROFILE))
+        rp.addWidget(lp)
+        rp.addWidget(self.profile_combo, 1)
+        layout.addWidget(row_profile)
+
+        row_decode = QtWidgets.QWidget()
+        rd = QtWidgets.QHBoxLayout(row_decode)
+        rd.setContentsMargins(0, 0, 0, 0)
+        rd.setSpacing(10)
+        ld = QtWidgets.QLabel("解码线程")
+        ld.setFixedWidth(label_w)
+        ld.setFont(self._font_scaled(0.022))
+        self.decode_combo = QtWidgets.QComboBox(objectName="decodeCombo")
+        self.decode_combo.setFont(self._font_scaled(0.022))
+        for label, mode in DECODE_THREAD_MODES:
+            self.decode_combo.addItem(label, mode)
+        self.decode_mode_label = QtWidgets.QLabel("", objectName="decodeModeLabel")  # 实际生效的模式
+        self.decode_mode_label.setFont(self._font_scaled(0.018))
+        rd.addWidget(ld)
+        rd.addWidget(self.decode_combo, 1)
+        rd.addWidget(self.decode_mode_label)
+        layout.addWidget(row_decode)
+
+        row_jitter = QtWidgets.QWidget()
+        rj = QtWidgets.QHBoxLayout(row_jitter)
+        rj.setContentsMargins(0, 0, 0, 0)
+        rj.setSpacing(10)
+        lj = QtWidgets.QLabel("平滑缓冲")
+        lj.setFixedWidth(label_w)
+        lj.setFont(self._font_scaled(0.022))
+        self.jitter_combo = QtWidgets.QComboBox(objectName="jitterCombo")
+        self.jitter_combo.setFont(self._font_scaled(0.022))
+        for label, frames in JITTER_BUFFER_MODES:
+            self.jitter_combo.addItem(label, frames)
+        rj.addWidget(lj)
+        rj.addWidget(self.jitter_combo, 1)
+        layout.addWidget(row_jitter)
+
         row3 = QtWidgets.QWidget()
         r3 = QtWidgets.QHBoxLayout(row3)
         r3.setContentsMargins(0, 0, 0, 0)
@@ -616,6 +1685,58 @@ class UIBase(QtWidgets.QMainWindow):
         r4.addStretch(1)
         layout.addWidget(row4)
 
+        row5 = QtWidgets.QWidget()
+        r5 = QtWidgets.QHBoxLayout(row5)
+        r5.setContentsMargins(0, 0, 0, 0)
+        r5.setSpacing(10)
+        l5 = QtWidgets.QLabel("OpenGL渲染")
+        l5.setFixedWidth(label_w)
+        l5.setFont(self._font_scaled(0.022))
+        self.opengl_video_check = ToggleSwitch(self)
+        r5.addWidget(l5)
+        r5.addWidget(self.opengl_video_check)
+        r5.addStretch(1)
+        layout.addWidget(row5)
+
+        row6 = QtWidgets.QWidget()
+        r6 = QtWidgets.QHBoxLayout(row6)
+        r6.setContentsMargins(0, 0, 0, 0)
+        r6.setSpacing(10)
+        l6 = QtWidgets.QLabel("延迟统计")
+        l6.setFixedWidth(label_w)
+        l6.setFont(self._font_scaled(0.022))
+        self.show_latency_check = ToggleSwitch(self)
+        r6.addWidget(l6)
+        r6.addWidget(self.show_latency_check)
+        r6.addStretch(1)
+        layout.addWidget(row6)
+
+        row7 = QtWidgets.QWidget()
+        r7 = QtWidgets.QHBoxLayout(row7)
+        r7.setContentsMargins(0, 0, 0, 0)
+        r7.setSpacing(10)
+        l7 = QtWidgets.QLabel("比赛录制")
+        l7.setFixedWidth(label_w)
+        l7.setFont(self._font_scaled(0.022))
+        self.recording_check = ToggleSwitch(self)
+        r7.addWidget(l7)
+        r7.addWidget(self.recording_check)
+        r7.addStretch(1)
+        layout.addWidget(row7)
+
+        row8 = QtWidgets.QWidget()
+        r8 = QtWidgets.QHBoxLayout(row8)
+        r8.setContentsMargins(0, 0, 0, 0)
+        r8.setSpacing(10)
+        l8 = QtWidgets.QLabel("单层HUD")
+        l8.setFixedWidth(label_w)
+        l8.setFont(self._font_scaled(0.022))
+        self.painted_hud_check = ToggleSwitch(self)
+        r8.addWidget(l8)
+        r8.addWidget(self.painted_hud_check)
+        r8.addStretch(1)
+        layout.addWidget(row8)
+
         layout.addStretch(1)
 
         btns = QtWidgets.QWidget()
@@ -634,41 +1755,27 @@ class UIBase(QtWidgets.QMainWindow):
         cancel.clicked.connect(self._cancel_menu)
         ok.clicked.connect(self._apply_menu)
 
-    def _plain_text(self, html: str) -> str:
-        return re.sub(r"<[^>]+>", "", html or "").strip()
-
     def _update_bottom_panel_layout(self):
         W, H = self.width(), self.height()
 
-        text_status = self._plain_text(self.status_label1.text())
-        text_armor = self._plain_text(self.status_label2.text())
+        text_status = self.status_label1.text()
+        text_armor = self.status_label2.text()
         fm_status = QtGui.QFontMetrics(self.status_label1.font())
         fm_armor = QtGui.QFontMetrics(self.status_label2.font())
         text_w_status = fm_status.horizontalAdvance(text_status) + 18
         text_w_armor = fm_armor.horizontalAdvance(text_armor) + 18
         text_w = max(text_w_status, text_w_armor)
 
-        min_inner = 360
-        max_inner = int(W * 0.40)
-        target_inner_w = max(min_inner, min(max_inner, text_w))
-        panel_margin_lr = 20
-        bl_w = target_inner_w + panel_margin_lr
-
-        base_h = int(H * 0.11)
-        bl_h = max(base_h, 86)
-
-        bl_x = int(W * 0.028)
+        extra_h = 0
+        if self.status_label3.isVisibleTo(self.bottom_left_panel):
+            extra_h = QtGui.QFontMetrics(self.status_label3.font()).height() + 4
+        self.bottom_left_panel.setGeometry(bottom_panel_geometry(W, H, text_w, fm_status.height(), extra_h))
 
-        line_h = fm_status.height()
-        bl_y = H - bl_h - int(H * 0.060) - line_h
-        bl_y = max(0, bl_y)
-
-        self.bottom_left_panel.setGeometry(bl_x, bl_y, bl_w, bl_h)
-
-        inner_w = self.bottom_left_panel.width() - panel_margin_lr
+        inner_w = self.bottom_left_panel.width() - 20  # 左右边距
         self.self_bar.setFixedWidth(inner_w)
         self.status_label1.setFixedWidth(inner_w)
         self.status_label2.setFixedWidth(inner_w)
+        self.status_label3.setFixedWidth(inner_w)
 
     def _auto_select_first_serial(self):
         self.logger.info("Auto-detecting serial ports on startup...")
@@ -684,43 +1791,155 @@ class UIBase(QtWidgets.QMainWindow):
         else:
             self.logger.warning("No serial ports found on startup.")
 
+    def _schedule_status(self):
+        """setter只记录数值，同一轮事件里的多次修改合并为一次_update_status"""
+        if not self._status_scheduled:
+            self._status_scheduled = True
+            QtCore.QTimer.singleShot(0, self._update_status)
+
     def _update_status(self):
-        if self.video_fps is None:
-            video_txt = "图传: <span style='color:#ff5a5a;'>未连接</span>"
-        else:
-            video_txt = f"图传: <span style='color:#eaeaea;'>{self.video_fps:.0f} fps</span>"
+        """按当前数值生成状态栏各行，只改动内容有变化的行"""
+        self._status_scheduled = False
+        red, white, plain = "#ff5a5a", "#eaeaea", None
+        latency = self.video_latency if self.show_latency else None
 
         if self.mqtt_freq is None:
-            mqtt_txt = "裁判端: <span style='color:#ff5a5a;'>未连接</span>"
+            line1 = [("裁判端: ", plain), ("未连接", red)]
         else:
-            mqtt_txt = f"裁判端: <span style='color:#eaeaea;'>{self.mqtt_freq:02.0f} Hz</span>"
-
-        self.status_label1.setText(f"<div style='text-align:center'>{mqtt_txt} | {video_txt}</div>")
+            line1 = [("裁判端: ", plain), (f"{self.mqtt_freq:02.0f} Hz", white)]
+
+        line1.append((" | 图传: ", plain))
+        if self.video_stalled:
+            line1.append(("断流，重连中", red))
+        elif self.video_fps is None:
+            line1.append(("未连接", red))
+        elif latency is None:
+            line1.append((f"{self.video_fps:.0f} fps", white))
+        else:
+            p50, p95 = latency["total"]
+            line1.append((f"{self.video_fps:.0f} fps {p50:.0f}/{p95:.0f} ms", white))
+        if self.video_fps is not None and self.video_jitter is not None:
+            depth, added = self.video_jitter
+            line1.append((f" 缓冲{depth}帧 +{added:.0f} ms", "#8ecae6"))
+        if self.video_fps is not None and self.video_dropped:
+            line1.append((f" 丢{self.video_dropped}", red))
+        if self.video_fps is not None and self.video_reconnect is not None:
+            line1.append((f" 重连 {self.video_reconnect * 1000:.0f} ms", "#ffd166"))
+
+        if self.recording_state is not None:
+            segments, dropped = self.recording_state
+            line1.append((" | 录制: ", plain))
+            line1.append((f"{segments}段 丢{dropped}", red if dropped else white))
 
         if self.uart_connect_state == 0:
-            uart_txt = "装甲板: <span style='color:#ff5a5a;'>串口未连接</span>"
-        elif self.uart_connect_state == 1:
-            uart_txt = "装甲板: <span style='color:#ff5a5a;'>无线未连接</span>"
+            line2 = [("装甲板: ", plain), ("串口未连接", red)]
         elif self.uart_connect_state == 2:
-            uart_txt = "装甲板: <span style='color:#eaeaea;'>无线已连接</span>"
+            line2 = [("装甲板: ", plain), ("无线已连接", white)]
+        else:
+            line2 = [("装甲板: ", plain), ("无线未连接", red)]
 
         if self.uart_connect_state != 2 or self.tx_rssi is None or self.rx_rssi is None:
-            rssi_tx_txt = f"TX: <span style='color:#ff5a5a;'>未连接</span>"
-            rssi_rx_txt = f"RX: <span style='color:#ff5a5a;'>未连接</span>"
+            line2 += [(" | TX: ", plain), ("未连接", red), (" | RX: ", plain), ("未连接", red)]
         else:
-            rssi_tx_txt = f"TX: <span style='color:#eaeaea;'>{self.tx_rssi:.0f} dBm</span>"
-            rssi_rx_txt = f"RX: <span style='color:#eaeaea;'>{self.rx_rssi:.0f} dBm</span>"
+            line2 += [(" | TX: ", plain), (f"{self.tx_rssi:.0f} dBm", white),
+                      (" | RX: ", plain), (f"{self.rx_rssi:.0f} dBm", white)]
 
-        self.status_label2.setText(f"<div style='text-align:center'>{uart_txt} | {rssi_tx_txt} | {rssi_rx_txt}</div>")
+        if latency is None:
+            line3 = "延迟: 无数据"
+        else:
+            # 各阶段 p50/p95
+            line3 = " | ".join(
+                f"{name} {latency[stage][0]:.0f}/{latency[stage][1]:.0f}"
+                for name, stage in (("解码", "decode"), ("转换", "convert"), ("交接", "handoff"), ("绘制", "paint"))
+            ) + " ms"
+
+        if self.painted_hud:  # 控件不显示，只更新单层HUD
+            self.hud_layer.set_status(line1, line2, line3 if self.show_latency else None)
+            return
 
-        self._update_bottom_panel_layout()
+        changed = self.status_label1.set_segments(line1)
+        changed |= self.status_label2.set_segments(line2)
+        if line3 != self.status_label3.text():
+            self.status_label3.setText(line3)
+
+        if changed:  # 面板宽度跟随前两行文字
+            self._update_bottom_panel_layout()
 
     def _update_ui_for_big_screen_mode(self):
         """根据大屏模式的设置，显示或隐藏UI元素"""
         is_big_screen = self.big_screen_mode
-        self.bottom_left_panel.setHidden(is_big_screen)
+        self.bottom_left_panel.setHidden(is_big_screen or self.painted_hud)
+        self.hud_layer.set_bottom_visible(not is_big_screen)
         self.overlay.setCrosshairVisible(not is_big_screen)
 
+    def _toggle_profiler(self):
+        PROFILER.set_enabled(not PROFILER.enabled)
+        self.profiler_overlay.setVisible(PROFILER.enabled)
+        if PROFILER.enabled:
+            self.profiler_overlay.raise_()
+
+    def _update_hud_mode(self):
+        """在控件HUD和单层HUD之间切换；单层HUD总是收到更新，控件只在显示时更新，切回时补上当前状态"""
+        painted = self.painted_hud
+        if not painted:
+            hud = self.hud_layer
+            for label, name in ((self.red_name_label, hud.red_name), (self.blue_name_label, hud.blue_name)):
+                if label.text() != name:
+                    label.setText(name)
+            for bar, painter in ((self.red_bar_top, hud.red_bar), (self.blue_bar_top, hud.blue_bar),
+                                 (self.self_bar, hud.self_bar)):
+                bar.set_color(painter.team)
+                bar.set_value(painter.value)
+            self.countdown_banner.set_text(hud.countdown)
+            self.countdown_banner.set_warning(hud.warning)
+        self.top_hud.setHidden(painted)
+        self.hud_layer.setVisible(painted)
+
+    def _update_video_surface(self):
+        """按设置在QLabel画面和OpenGL画面之间切换，叠加层跟随当前画面"""
+        if self.opengl_video and self.video_surface is None:
+            if not QtGui.QOpenGLContext().create():  # 平台不支持OpenGL时直接回退
+                self.logger.warning("OpenGL画面不可用，回退到QLabel画面: 无法创建OpenGL上下文")
+                self.opengl_video = False
+                self.opengl_video_check.setChecked(False)
+                return
+            self.video_surface = VideoSurface()
+            self.video_surface.failed.connect(self._on_video_surface_failed, QtCore.Qt.QueuedConnection)
+            self.video_surface.painted.connect(self._on_video_painted)
+            self.video_stack.addWidget(self.video_surface)
+
+        if self.opengl_video:
+            target = self.video_surface
+            QtCore.QTimer.singleShot(1000, self._check_video_surface)  # 创建上下文失败时不会回调initializeGL
+        else:
+            target = self.bg_label
+        self.video_stack.setCurrentWidget(target)
+        self.overlay.setParent(target)
+        self.overlay.setGeometry(0, 0, self.width(), self.height())
+        self.overlay.show()
+        self.overlay.raise_()
+
+    def _on_video_painted(self):
+        if self._painting_frame is not None:
+            self._painting_frame.mark_painted()
+            self._painting_frame = None
+
+    def _check_video_surface(self):
+        surface = self.video_surface
+        if surface is not None and self.video_stack.currentWidget() is surface and not surface.isValid():
+            self._on_video_surface_failed("无法创建OpenGL上下文")
+
+    def _on_video_surface_failed(self, reason: str):
+        if self.video_surface is None:
+            return
+        self.logger.warning(f"OpenGL画面不可用，回退到QLabel画面: {reason}")
+        self.opengl_video = False
+        self.opengl_video_check.setChecked(False)
+        self._update_video_surface()
+        self.video_stack.removeWidget(self.video_surface)
+        self.video_surface.deleteLater()
+        self.video_surface = None
+
     def _format_serial_label(self, device: str, desc: str) -> str:
         com = (device or "").strip()
         d = (desc or "").strip()
@@ -733,6 +1952,8 @@ class UIBase(QtWidgets.QMainWindow):
     def resizeEvent(self, e):
         W, H = self.width(), self.height()
         self.overlay.setGeometry(0, 0, W, H)
+        self.hud_layer.setGeometry(0, 0, W, H)
+        self.profiler_overlay.move(int(W * 0.028), int(H * 0.16))
 
         top_y = int(H * 0.020)
         top_h = int(H * 0.12)
@@ -756,6 +1977,10 @@ class UIBase(QtWidgets.QMainWindow):
         settings_btn_y = exit_btn_y + btn_h + gap
         self.settings_btn.setGeometry(btn_x, settings_btn_y, btn_w, btn_h)
 
+        pip_w = int(W * 0.24)
+        pip_h = pip_w * 9 // 16
+        self.pip_label.setGeometry(W - right_margin - pip_w, settings_btn_y + btn_h + gap, pip_w, pip_h)
+
         self._update_bottom_panel_layout()
 
         self._center_menu()
@@ -763,6 +1988,10 @@ class UIBase(QtWidgets.QMainWindow):
 
         super().resizeEvent(e)
 
+    def showEvent(self, e):
+        super().showEvent(e)
+        self.frame_clock.start()
+
     def _center_menu(self):
         W, H = self.width(), self.height()
         panel_w = int(W * 0.40)
@@ -791,7 +2020,7 @@ class UIBase(QtWidgets.QMainWindow):
     def _qss(self):
         return """
         #central { background: #0f1216; }
-        #bgLabel { background: #0f1216; }
+        #videoStack, #bgLabel { background: #0f1216; }
         #topHud { background: transparent; }
         #countdownBanner { background: rgba(0,0,0,0.35); border-radius: 14px; }
         #bottomPanel { background: rgba(0,0,0,0.30); border-radius: 10px; }
@@ -805,10 +2034,12 @@ class UIBase(QtWidgets.QMainWindow):
         #menuMask { background: rgba(0,0,0,0.55); }
         #menuPanel { background: rgba(25,28,34,0.98); border: 1px solid rgba(255,255,255,0.12); border-radius: 16px; }
         #menuTitle { color: #f0f0f0; }
-        #serialCombo, #videoEdit, #serverEdit {
+        #decodeModeLabel { color: rgba(255,255,255,0.55); }
+        #serialCombo, #profileCombo, #decodeCombo, #jitterCombo, #videoEdit, #pipEdit, #serverEdit {
             background: rgba(255,255,255,0.10); color: #ffffff; border: 1px solid rgba(255,255,255,0.22);
             border-radius: 8px; padding: 8px 10px;
         }
+        #pipLabel { background: #0f1216; border: 2px solid rgba(255,255,255,0.35); border-radius: 6px; }
         #redNameLabel { color: #ff6b6b; }
         #blueNameLabel { color: #6ea8ff; }
         QLabel { color: #ffffff; }
@@ -851,6 +2082,8 @@ class UI(UIBase):
         self.audio_output.setVolume(1.0)
         self.bgm_start_time = None
 
+        self._frame_seq = None  # 已显示的视频帧序号
+
         self._last_mouse_time = time.perf_counter()
         self._wheel_accum = 0.0
         self._key_state = {
@@ -871,36 +2104,100 @@ class UI(UIBase):
     def set_red_name(self, name: str):
         if name is None:
             return
-        self.red_name_label.setText(name)
-        self.red_name_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.hud_layer.set_red_name(name)
+        if not self.painted_hud and name != self.red_name_label.text():
+            self.red_name_label.setText(name)
 
     def set_blue_name(self, name: str):
         if name is None:
             return
-        self.blue_name_label.setText(name)
-        self.blue_name_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.hud_layer.set_blue_name(name)
+        if not self.painted_hud and name != self.blue_name_label.text():
+            self.blue_name_label.setText(name)
 
-    def set_frame(self, frame_bgr: np.ndarray):
-        if frame_bgr is None:
+    @PROFILER.profile("UI.set_frame")
+    def set_frame(self, frame):
+        if frame is None or frame.seq == self._frame_seq:  # 没有新帧，不重绘
+            return
+        if frame.format != self.get_video_format():  # 画面刚切换，视频线程还没跟上
             return
-        h, w = frame_bgr.shape[:2]
-        qimg = QtGui.QImage(frame_bgr.data, w, h, 3 * w, QtGui.QImage.Format_BGR888)
+        frame.mark_handoff()
+        self._painting_frame = frame
+        if frame.format == "yuv":
+            self.video_surface.set_frame(frame.image, dimmed=frame.stale)
+            self._frame_seq = frame.seq
+            return
+        self.bg_label.dimmed = frame.stale
         target = self.bg_label.size()
         if target.width() == 0 or target.height() == 0:
             return
-        qimg_scaled = qimg.scaled(target, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
-        final_image = QtGui.QImage(target.width(), target.height(), QtGui.QImage.Format_RGB888)
-        final_image.fill(QtCore.Qt.black)
-        x_offset = (target.width() - qimg_scaled.width()) // 2
-        y_offset = (target.height() - qimg_scaled.height()) // 2
-        painter = QtGui.QPainter(final_image)
-        painter.drawImage(x_offset, y_offset, qimg_scaled)
-        painter.end()
-        self.bg_label.setPixmap(QtGui.QPixmap.fromImage(final_image))
+        self.bg_label.set_image(frame.image)  # 视频线程已按显示尺寸转换好
+        self._frame_seq = frame.seq
+
+    @PROFILER.profile("UI.set_pip_frame")
+    def set_pip_frame(self, frame):
+        """画中画副视频流，frame为None或没有设置副视频流时隐藏"""
+        if frame is None or not self.pip_source:
+            self.pip_label.hide()
+            self._pip_seq = None
+            return
+        if frame.seq == self._pip_seq:
+            return
+        self.pip_label.set_image(frame.image)
+        self._pip_seq = frame.seq
+        if not self.pip_label.isVisible():
+            self.pip_label.show()
+            self.pip_label.raise_()
 
     def set_video_fps(self, fps):
+        if fps == self.video_fps:
+            return
         self.video_fps = fps
-        self._update_status()
+        self._schedule_status()
+
+    def set_video_jitter(self, jitter: tuple[int, float] | None):
+        if jitter == self.video_jitter:
+            return
+        self.video_jitter = jitter
+        self._schedule_status()
+
+    def set_video_stalled(self, stalled: bool):
+        if stalled == self.video_stalled:
+            return
+        self.video_stalled = stalled
+        self._schedule_status()
+
+    def set_video_dropped(self, dropped: int | None):
+        if dropped == self.video_dropped:
+            return
+        self.video_dropped = dropped
+        self._schedule_status()
+
+    def set_video_latency(self, latency: dict | None):
+        """latency为Video.latency.summary()的结果"""
+        if latency == self.video_latency:
+            return
+        self.video_latency = latency
+        self._schedule_status()
+
+    def set_video_reconnect(self, ttff: float | None):
+        """ttff为最近一次重连从断开到出第一帧的耗时，None表示不显示"""
+        if ttff == self.video_reconnect:
+            return
+        self.video_reconnect = ttff
+        self._schedule_status()
+
+    def set_recording_state(self, state: tuple[int, int] | None):
+        if state == self.recording_state:
+            return
+        self.recording_state = state
+        self._schedule_status()
+
+    def set_video_decode_mode(self, mode: str | None):
+        if mode == self.decode_mode:
+            return
+        self.decode_mode = mode
+        self.decode_mode_label.setText(f"当前: {mode}" if mode else "")
 
     def set_countdown(self, seconds: float | None):
         if seconds is None:
@@ -912,8 +2209,7 @@ class UI(UIBase):
         bgm_start_time = self.bgm_start_time
         if seconds_int >= 0:
             m, s = seconds_int // 60, seconds_int % 60
-            self.countdown_banner.set_text(f"{m}:{s:02d}")
-            self.countdown_banner.set_warning(seconds <= 10)
+            self._show_countdown(f"{m}:{s:02d}", seconds <= 10)
             if seconds == 0:
                 self.media_player.stop()
                 self.bgm_start_time = None
@@ -923,8 +2219,7 @@ class UI(UIBase):
         else:
             abs_seconds = abs(seconds_int)
             m, s = abs_seconds // 60, abs_seconds % 60
-            self.countdown_banner.set_text(f"-{m}:{s:02d}")
-            self.countdown_banner.set_warning(False)
+            self._show_countdown(f"-{m}:{s:02d}", False)
             bgm_start_time = time.time() - (120 - -seconds)
 
         if self.bgm_start_time is None or abs(bgm_start_time - self.bgm_start_time) > 0.5:
@@ -934,42 +2229,72 @@ class UI(UIBase):
                 self.media_player.play()
                 self.bgm_start_time = bgm_start_time
 
+    def _show_countdown(self, text: str, warn: bool):
+        self.hud_layer.set_countdown(text, warn)
+        if not self.painted_hud:
+            self.countdown_banner.set_text(text)
+            self.countdown_banner.set_warning(warn)
+
     def set_color(self, color: str | None):
         self.color = color if color in ("red", "blue") else None
-        self.self_bar.set_color(self.color)
+        self.hud_layer.set_color(self.color)
+        if not self.painted_hud:
+            self.self_bar.set_color(self.color)
 
     def set_red_hp(self, hp: int | None):
         if hp is None:
             return
-        self.red_bar_top.set_value(hp)
+        self.hud_layer.set_red_hp(hp)
         if self.color == "red":
-            self.self_bar.set_value(hp)
+            self.hud_layer.set_self_hp(hp)
+        if not self.painted_hud:
+            self.red_bar_top.set_value(hp)
+            if self.color == "red":
+                self.self_bar.set_value(hp)
 
     def set_blue_hp(self, hp: int | None):
         if hp is None:
             return
-        self.blue_bar_top.set_value(hp)
+        self.hud_layer.set_blue_hp(hp)
         if self.color == "blue":
-            self.self_bar.set_value(hp)
+            self.hud_layer.set_self_hp(hp)
+        if not self.painted_hud:
+            self.blue_bar_top.set_value(hp)
+            if self.color == "blue":
+                self.self_bar.set_value(hp)
 
     def set_uart_connect_state(self, state):
+        if state == self.uart_connect_state:
+            return
         self.uart_connect_state = state
-        self._update_status()
+        self._schedule_status()
 
     def set_rssi(self, tx_rssi, rx_rssi):
+        if (tx_rssi, rx_rssi) == (self.tx_rssi, self.rx_rssi):
+            return
         self.tx_rssi = tx_rssi
         self.rx_rssi = rx_rssi
-        self._update_status()
+        self._schedule_status()
 
     def set_mqtt_freq(self, freq):
+        if freq == self.mqtt_freq:
+            return
         self.mqtt_freq = freq
-        self._update_status()
+        self._schedule_status()
 
     def set_center_txt(self, line1: str, line2: str, color="white"):
         self.overlay.set_center_text(line1, line2, color)
 
     def get_serial_port(self) -> str | None: return self.serial_port
     def get_video_source(self) -> str | None: return self.video_source
+    def get_video_profile(self) -> str: return self.video_profile
+    def get_decode_threads(self) -> str: return self.decode_threads
+    def get_jitter_buffer(self) -> int: return self.jitter_buffer
+    def get_pip_source(self) -> str: return self.pip_source
+    def get_pip_size(self) -> tuple[int, int]: return self.pip_label.width() - 4, self.pip_label.height() - 4  # 去掉边框
+    def get_recording(self) -> bool: return self.recording
+    def get_video_size(self) -> tuple[int, int]: return self.video_stack.width(), self.video_stack.height()
+    def get_video_format(self) -> str: return "yuv" if self.opengl_video else "bgra"
     def get_mqtt_url(self) -> str | None: return self.mqtt_url
     def get_dbus_packet(self) -> bytes: return self._dbus_packet
 
@@ -1021,6 +2346,7 @@ class UI(UIBase):
         packet[9] = 0x01
         return bytes(packet)
 
+    @PROFILER.profile("UI._sample_input")
     def _sample_input(self):
         if not self.isActiveWindow():
             if not self._cursor_shown:
@@ -1073,6 +2399,8 @@ class UI(UIBase):
                 self.setCursor(QtCore.Qt.ArrowCursor)
                 self.exit_btn.setEnabled(True)
                 self.settings_btn.setEnabled(True)
+        elif e.key() == QtCore.Qt.Key_F3 and not e.isAutoRepeat():
+            self._toggle_profiler()
         super().keyPressEvent(e)
 
     def changeEvent(self, event):
@@ -1084,6 +2412,10 @@ class UI(UIBase):
                 self.settings_btn.setEnabled(True)
         super().changeEvent(event)
 
+    def resizeEvent(self, e):
+        self._frame_seq = None  # 窗口尺寸变化后需按新尺寸重绘当前帧
+        super().resizeEvent(e)
+
     def mousePressEvent(self, e):
         if not self.menu_panel.isVisible():
             if self._cursor_shown:
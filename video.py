@@ -1,14 +1,391 @@
 import av
 import cv2
 
+import os
+import random
 import threading
 from collections import deque
 import time
 import logging
 
+from buffer_pool import POOL
+from recorder import Recorder
+
 # ffmpeg列出摄像头
 # ffmpeg -list_devices true -f dshow -i dummy
 
+NETWORK_SCHEMES = ("rtsp://", "rtsps://", "rtp://", "udp://", "tcp://", "http://", "https://")
+
+# 裸码流视频源的前缀 -> demux格式，如 h264+udp://0.0.0.0:5000 为UDP推送的Annex-B裸流
+RAW_STREAM_FORMATS = {"h264+": "h264", "hevc+": "hevc", "h265+": "hevc"}
+
+# UDP直推视频源（MPEG-TS或裸流）的打开参数：格式和编码已知，不做探测；
+# 接收缓冲只留约0.3秒@8Mbps，处理跟不上时丢旧数据而不是报错
+UDP_OPTIONS = {
+    "probesize": "32",
+    "analyzeduration": "0",
+    "fpsprobesize": "0",
+    "fifo_size": "2048",            # 单位188字节
+    "overrun_nonfatal": "1",
+    "buffer_size": "1048576",       # socket接收缓冲
+}
+
+# 网络视频源的打开参数，键为延迟模式
+LATENCY_PROFILES = {
+    "default": {},
+    "low_latency_tcp": {
+        "fflags": "nobuffer",       # 不在demux层缓存数据
+        "probesize": "32",          # 最小探测量，尽快开始解码
+        "analyzeduration": "0",
+        "max_delay": "0",           # 不为重排等待
+        "reorder_queue_size": "0",  # RTP不做乱序重排
+        "rtsp_transport": "tcp",
+    },
+    "low_latency_udp": {
+        "fflags": "nobuffer",
+        "probesize": "32",
+        "analyzeduration": "0",
+        "max_delay": "0",
+        "reorder_queue_size": "0",
+        "rtsp_transport": "udp",
+    },
+}
+
+
+# 解码线程模式：SLICE片级并行不增加延迟；FRAME帧级并行吞吐更高，但每个线程多缓存一帧
+DECODE_THREAD_TYPES = ("SLICE", "FRAME", "AUTO", "NONE")
+
+
+# 断线重连退避：首次立即重试，之后按指数增长并加随机抖动，避免与发送端同步撞车
+RECONNECT_BASE_DELAY = 0.05
+RECONNECT_MAX_DELAY = 1.0
+
+# 已缓存解码参数时的打开参数，跳过大部分流分析
+FAST_OPEN_OPTIONS = {"probesize": "32", "analyzeduration": "0", "fpsprobesize": "0"}
+
+
+OPEN_TIMEOUT = 3.0  # 打开视频源超时（秒）
+STALL_TIMEOUT = 0.3  # 默认断流判定时间（秒），超过该时间读不到数据包就立即重连
+
+# 实时视频源解码跟不上时，队首数据包等待超过该时间就丢包追帧（秒）
+DECODE_LATENCY_BUDGET = 0.1
+PACKET_QUEUE_SIZE = 256  # 数据包队列上限，实时源满了之后丢到下一个关键帧，文件源则等待
+
+
+JITTER_MAX_FRAMES = 3  # 平滑缓冲最多帧数
+JITTER_DRIFT = 0.0002  # 每帧放宽的时钟偏移（秒），网络延迟变大后逐渐跟上
+
+
+SKIP_FRAME_MODES = ("DEFAULT", "NONREF", "NONKEY")  # 解码器跳帧模式，NONKEY只解关键帧
+
+
+def backoff_delay(attempts: int) -> float:
+    """第attempts次失败后的等待时间，指数退避加随机抖动"""
+    return min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * 2 ** attempts) * random.uniform(0.5, 1.0)
+
+
+def raw_stream(source: str) -> tuple[str | None, str]:
+    """拆分视频源为(裸码流demux格式, 地址)，不是裸码流时格式为None"""
+    for prefix, raw_format in RAW_STREAM_FORMATS.items():
+        if source.startswith(prefix):
+            return raw_format, source[len(prefix):]
+    return None, source
+
+
+def auto_thread_count() -> int:
+    """按CPU核数选择解码线程数，留一个核给UI线程"""
+    return max(1, min(8, (os.cpu_count() or 2) - 1))
+
+
+# 可由OpenGL画面直接上传的YUV格式，其他格式先转换为yuv420p
+YUV_FORMATS = ("yuv420p", "yuvj420p", "nv12")
+
+
+# 每帧打点的阶段：读到数据包、解码完成、转换完成、交给UI、绘制完成
+LATENCY_STAMPS = ("read", "decoded", "converted", "handoff", "painted")
+# 统计的耗时：相邻打点之差，以及读包到绘制的总延迟
+LATENCY_STAGES = ("decode", "convert", "handoff", "paint", "total")
+
+
+class LatencyStats:
+    """最近若干帧各阶段耗时的滚动分位数（毫秒）"""
+
+    def __init__(self, window=120, interval=0.5):
+        self._samples = {stage: deque(maxlen=window) for stage in LATENCY_STAGES}
+        self._interval = interval  # 分位数缓存时间，避免每次读取都排序
+        self._summary = None
+        self._summary_time = 0.0
+
+    def record(self, stamps):
+        for stage, start, end in zip(LATENCY_STAGES, stamps, stamps[1:]):
+            self._samples[stage].append((end - start) * 1000)
+        self._samples["total"].append((stamps[-1] - stamps[0]) * 1000)
+
+    def percentile(self, stage: str, q: float) -> float | None:
+        samples = sorted(self._samples[stage])
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+    def summary(self) -> dict | None:
+        """{阶段: (p50, p95)}，没有样本时为None"""
+        now = time.perf_counter()
+        if now - self._summary_time > self._interval:
+            self._summary_time = now
+            if self._samples["total"]:
+                self._summary = {stage: (self.percentile(stage, 0.5), self.percentile(stage, 0.95))
+                                 for stage in LATENCY_STAGES}
+            else:
+                self._summary = None
+        return self._summary
+
+    def clear(self):
+        for samples in self._samples.values():
+            samples.clear()
+        self._summary = None
+
+
+class Demuxer(threading.Thread):
+    """读取线程：从容器读取数据包放入有界队列，解码线程从队列取包
+
+    读取不受解码速度影响，积压时由解码线程调用trim()丢包。容器只在本线程读取和关闭。
+    录制需要按读取顺序拿到所有数据包（含丢掉的），解码线程处理完后调用finish()按顺序取出。
+    """
+
+    def __init__(self, container, live: bool):
+        super().__init__(daemon=True)
+        self.dropped = 0  # 队列满时丢弃的数据包数，由解码线程取走计数
+        self.packets = 0  # 已读到的数据包数
+        self.last_read = time.perf_counter()  # 最近读到数据包的时间，用于断流判定
+
+        self._container = container
+        self._packets = container.demux(video=0)
+        self._live = live  # 实时源不能等待，文件源队列满时暂停读取
+        self._queue = deque()  # (packet, 读到的时间)
+        self._cond = threading.Condition()
+        self._stopped = False  # 解码线程已调用stop()
+        self._ended = False  # 读取已结束
+        self._error = None  # 读取结束的原因，队列取空后由get()抛出
+        self._wait_keyframe = False
+        self._order = deque()  # 已读到、还没交给录制的数据包，按读取顺序
+        self._finished = set()  # _order中已处理完（解码完或丢弃）的数据包id
+
+    def run(self):
+        try:
+            for packet in self._packets:
+                if self._stopped:
+                    break
+                self._put(packet, time.perf_counter())
+            else:
+                self._error = StopIteration()
+        except Exception as e:
+            self._error = e
+        finally:
+            with self._cond:
+                self._ended = True
+                self._cond.notify_all()
+                # 已读到的数据包引用容器中的流，解码和交给录制时都要用，等解码线程stop()后再关闭
+                self._cond.wait_for(lambda: self._stopped)
+            self._container.close()
+
+    def _put(self, packet, read_time):
+        self.packets += 1
+        self.last_read = read_time
+        with self._cond:
+            if len(self._queue) >= PACKET_QUEUE_SIZE:
+                if not self._live:
+                    self._cond.wait_for(lambda: len(self._queue) < PACKET_QUEUE_SIZE or self._stopped)
+                else:
+                    self.dropped += len(self._queue)
+                    self._finished.update(id(item[0]) for item in self._queue)
+                    self._queue.clear()
+                    self._wait_keyframe = True
+            self._order.append(packet)
+            if self._wait_keyframe:
+                if not packet.is_keyframe:
+                    self.dropped += 1
+                    self._finished.add(id(packet))
+                    return
+                self._wait_keyframe = False
+            self._queue.append((packet, read_time))
+            self._cond.notify_all()
+
+    def get(self, timeout=0.5):
+        """取一个数据包，超时返回None；读取已结束且队列为空时抛出结束原因"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._queue or self._ended or self._stopped, timeout):
+                return None
+            if self._queue:
+                item = self._queue.popleft()
+                self._cond.notify_all()
+                return item
+        raise self._error or StopIteration()
+
+    def trim(self, budget: float) -> list:
+        """实时源积压超过budget秒时丢包：先丢可丢弃的非参考帧，仍超出则丢到队列中最新的关键帧"""
+        if not self._live:
+            return []
+        with self._cond:
+            queue = self._queue
+            now = time.perf_counter()
+            if not queue or now - queue[0][1] <= budget:
+                return []
+
+            dropped = [item for item in queue if item[0].is_disposable]
+            if dropped:
+                queue = deque(item for item in queue if not item[0].is_disposable)
+            if queue and now - queue[0][1] > budget:
+                keyframes = [i for i, item in enumerate(queue) if item[0].is_keyframe]
+                if keyframes and keyframes[-1] > 0:
+                    for _ in range(keyframes[-1]):
+                        dropped.append(queue.popleft())
+            self._queue = queue
+            self._cond.notify_all()
+            return dropped
+
+    def finish(self, packets) -> list:
+        """标记packets已处理完，返回可以交给录制的数据包：读取顺序上之前的都已处理完"""
+        with self._cond:
+            finished = self._finished
+            finished.update(id(packet) for packet in packets)
+            order = self._order
+            released = []
+            while order and id(order[0]) in finished:
+                packet = order.popleft()
+                finished.discard(id(packet))
+                released.append(packet)
+            return released
+
+    def behind(self, budget: float) -> bool:
+        """队列中还有等待超过budget秒的数据包"""
+        queue = self._queue
+        return self._live and bool(queue) and time.perf_counter() - queue[0][1] > budget
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+
+class SourceSwitcher(threading.Thread):
+    """切换视频源时在后台打开新源并解出第一帧，旧源继续显示，由视频线程整体替换"""
+
+    def __init__(self, video, source):
+        super().__init__(daemon=True)
+        self.source = source
+        self.start_time = time.perf_counter()
+        self.result = None  # 准备好后为(container, decoder, cached, decode_mode, demuxer, 已读数据包, 第一帧)
+
+        self._video = video
+        self._lock = threading.Lock()
+        self._taken = False
+
+    def cancelled(self) -> bool:
+        return self._taken or self._video._switch_source != self.source
+
+    def take(self):
+        """视频线程取走结果，之后本线程准备好的连接自行关闭"""
+        with self._lock:
+            self._taken = True
+            return self.result
+
+    def run(self):
+        video = self._video
+        attempts = 0
+        while not self.cancelled():
+            try:
+                container, decoder, cached, decode_mode = video._open_stream(self.source)
+            except Exception as e:
+                video.logger.info(f"后台打开视频源报错: {e}")
+                time.sleep(backoff_delay(attempts))
+                attempts += 1
+                continue
+
+            demuxer = Demuxer(container, video._is_live(self.source))
+            demuxer.start()
+            packets = []
+            try:
+                while not self.cancelled():
+                    item = demuxer.get(video._stall_timeout)
+                    if item is None:
+                        raise TimeoutError("无数据")
+                    packets.append(item)
+                    frames = decoder.decode(item[0])
+                    if frames:
+                        with self._lock:
+                            if not self._taken:
+                                self.result = (container, decoder, cached, decode_mode, demuxer, packets, frames[-1])
+                                return
+                        break
+            except Exception as e:
+                video.logger.info(f"后台解码新视频源报错: {e}")
+                if cached:
+                    video._stream_cache.pop(self.source, None)
+                time.sleep(backoff_delay(attempts))
+                attempts += 1
+            demuxer.stop()
+
+
+class PipBudget:
+    """画中画副视频流的CPU预算
+
+    主视频流每帧解码+转换耗时（p95）占帧间隔的比例超过high时逐级降低副视频流的帧率，
+    低于low时逐级恢复；最低几级只解关键帧。
+    """
+
+    LEVELS = ((15, "DEFAULT"), (10, "DEFAULT"), (5, "DEFAULT"), (2, "NONKEY"), (1, "NONKEY"))  # (最高帧率, 跳帧模式)
+
+    def __init__(self, high=0.6, low=0.3, interval=1.0):
+        self.level = 0
+        self.load = None  # 最近一次计算的主视频流负载
+
+        self._high = high
+        self._low = low
+        self._interval = interval  # 调整间隔（秒），避免来回抖动
+        self._update_time = 0.0
+
+    def update(self, main_video) -> tuple[int, str]:
+        now = time.perf_counter()
+        if now - self._update_time >= self._interval:
+            self._update_time = now
+            summary = main_video.latency.summary()
+            fps = main_video.fps
+            if summary is not None and fps:
+                self.load = (summary["decode"][1] + summary["convert"][1]) / (1000 / fps)
+                if self.load > self._high:
+                    self.level = min(self.level + 1, len(self.LEVELS) - 1)
+                elif self.load < self._low:
+                    self.level = max(self.level - 1, 0)
+            else:
+                self.load = None
+        return self.LEVELS[self.level]
+
+
+class VideoFrame:
+    """视频线程交给UI的一帧，seq单调递增，UI据此判断是否为新帧"""
+
+    __slots__ = ("image", "format", "seq", "timestamp", "stamps", "latency", "stale")
+
+    def __init__(self, image, format: str, seq: int, stamps: list, latency: LatencyStats, stale=False):
+        self.image = image          # "bgra": ndarray（即QImage.Format_RGB32）；"yuv": av.VideoFrame
+        self.format = format        # 输出格式，见Video.set_output_format
+        self.seq = seq              # 帧序号
+        self.timestamp = stamps[0]  # 采集时间（读到数据包的time.perf_counter）
+        self.stamps = stamps        # 各阶段打点，见LATENCY_STAMPS
+        self.latency = latency
+        self.stale = stale          # 断线期间保留的最后一帧，UI调暗显示
+
+    def mark_handoff(self):
+        self.stamps[3] = time.perf_counter()
+
+    def mark_painted(self):
+        """画面绘制完成，整帧的打点计入统计"""
+        if self.stale or self.stamps[3] is None or self.stamps[4] is not None:
+            return
+        self.stamps[4] = time.perf_counter()
+        self.latency.record(self.stamps)
+
+
 class Video(threading.Thread):
     def __init__(self, level=logging.WARNING):
         super().__init__(daemon=True)
@@ -17,65 +394,568 @@ class Video(threading.Thread):
         self.logger.setLevel(level)
 
         # 可读取
-        self.frame = None
+        self._frame: VideoFrame | None = None  # 通过frame属性读取
         self.fps = None
+        self.dropped = None  # 最近1秒为追帧丢弃的数据包和画面数
+        self.jitter: tuple[int, float] | None = None  # 平滑缓冲开启时为(当前缓冲帧数, 平均增加的延迟ms)
+        self.stalled = False  # 播放中断流，正在重连
+        self.decode_mode: str | None = None  # 实际生效的解码线程模式，如"SLICE x4"
+        self.latency = LatencyStats()  # 各阶段延迟统计
+        self.recorder: Recorder | None = None  # 录制中时不为None
+        self.reconnect_ttff: float | None = None  # 最近一次（重）连接从断开到出第一帧的耗时，单位秒
 
         self._source = None
+        self._switch_source = None  # 正在后台打开的新视频源
+        self._switcher: SourceSwitcher | None = None
+        self._profile = "default"
+        self._thread_type = "SLICE"
+        self._thread_count = 0  # 0表示自动
+        self._output_size = None  # 显示区域尺寸(w, h)，None表示按原始分辨率输出
+        self._output_format = "bgra"
+        self._stall_timeout = STALL_TIMEOUT
+        self._skip_frame = "DEFAULT"
+        self._skip_frame_changed = False
+        self._max_fps = 0  # 输出帧率上限，0表示不限
+        self._output_time = 0.0
+        self._jitter_frames = 0  # 平滑缓冲帧数，0表示解码后立即显示
+        self._jitter_queue = deque()  # (帧, 放出时间)
+        self._jitter_offset = None  # 本地时钟 - PTS
+        self._jitter_pts = None
+        self._jitter_interval = 1 / 60  # 帧间隔估计（秒）
+        self._jitter_added = None
+        self._jitter_lock = threading.Lock()  # 平滑缓冲队列和_frame：视频线程放入，界面线程读取时放出
         self._container = None
+        self._reset_requested = False  # 其他线程修改设置后由视频线程断开，避免关闭正在读取的容器
+        self._decoder = None  # 解码器，使用缓存参数时独立于容器创建
+        self._demuxer: Demuxer | None = None  # 读取线程，容器由它读取和关闭
+        self._stream_cache = {}  # 视频源 -> 上次探测到的解码参数，重连时跳过流分析
+        self._cached_decoder = False  # 当前解码器是否由缓存参数创建
+        self._attempts = 0  # 连续连接失败次数，用于退避
+        self._disconnect_time = None  # 断开时间，出第一帧后清空
+        self._reconnected_at = 0.0
+        self._read_times = {}  # pts -> 读到数据包的时间，解码器可能重排或延后输出
+        self._seq = 0  # 帧序号，重连后也不回退
         self._timestamps = deque()  # 用于统计视频帧率
+        self._drop_times = deque()  # 用于统计丢帧数
+
+    @property
+    def frame(self) -> VideoFrame | None:
+        """当前应显示的帧；开启平滑缓冲时，读取时按PTS放出到期的帧"""
+        if self._jitter_frames:
+            with self._jitter_lock:
+                self._release_jitter()
+        return self._frame
+
+    @frame.setter
+    def frame(self, frame: VideoFrame | None):
+        with self._jitter_lock:
+            self._jitter_queue.clear()
+            self._frame = frame
 
     def set_source(self, source):
-        if source == self._source:
+        """正在显示画面时，新源在后台打开，出第一帧后再替换，切换过程中不黑屏"""
+        target = self._source if self._switch_source is None else self._switch_source
+        if source == target:
             return
 
-        self.logger.info(f"视频源变更: {self._source} -> {source}")
-        self._source = source
+        self.logger.info(f"视频源变更: {target} -> {source}")
+        frame = self._frame
+        if source is not None and source != self._source and frame is not None and not frame.stale:
+            self._switch_source = source
+            return
+
+        self._switch_source = None
+        if source != self._source:
+            self._source = source
+            self._reset_requested = True
+
+    def _finish_switch_now(self):
+        """设置变化需要重连时，未完成的切换直接改为立即切换"""
+        if self._switch_source is not None:
+            self._source = self._switch_source
+            self._switch_source = None
+            self._reset_requested = True
+
+    def set_profile(self, profile: str):
+        """设置网络视频源的延迟模式，见LATENCY_PROFILES"""
+        if profile not in LATENCY_PROFILES:
+            profile = "default"
+        if profile == self._profile:
+            return
+
+        self.logger.info(f"视频延迟模式变更: {self._profile} -> {profile}")
+        self._profile = profile
+        self._finish_switch_now()
+
+        if self._source is not None and raw_stream(self._source)[1].startswith(NETWORK_SCHEMES):
+            self._reset_requested = True  # 重新连接以应用新参数
+
+    def set_decode_threads(self, thread_type: str, thread_count: int = 0):
+        """设置解码线程模式（见DECODE_THREAD_TYPES）和线程数，线程数为0时按CPU核数自动选择"""
+        if thread_type not in DECODE_THREAD_TYPES:
+            thread_type = "SLICE"
+        if (thread_type, thread_count) == (self._thread_type, self._thread_count):
+            return
+
+        self.logger.info(f"解码线程变更: {self._thread_type}/{self._thread_count} -> {thread_type}/{thread_count}")
+        self._thread_type = thread_type
+        self._thread_count = thread_count
+        self._finish_switch_now()
+
+        if self._container is not None:
+            self._reset_requested = True  # 解码器已打开，需重新连接才能生效
+
+    def set_recording(self, enabled: bool, record_format="mkv"):
+        """开关比赛录制：数据包原样转封装为分段文件，不重新编码"""
+        if enabled == (self.recorder is not None):
+            return
+
+        if enabled:
+            self.logger.info("开始录制")
+            recorder = Recorder(record_format=record_format)
+            recorder.start()
+            self.recorder = recorder
+        else:
+            self.logger.info("停止录制")
+            self.recorder.stop()
+            self.recorder = None
+
+    def set_match_state(self, countdown_ms, state):
+        """裁判端比赛状态，用于标记录制分段"""
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.set_match_state(countdown_ms, state)
+
+    def set_jitter_buffer(self, frames: int):
+        """平滑缓冲：缓存0~3帧，按PTS匀速放出，用延迟换流畅"""
+        frames = max(0, min(JITTER_MAX_FRAMES, frames))
+        if frames == self._jitter_frames:
+            return
+
+        self.logger.info(f"平滑缓冲变更: {self._jitter_frames} -> {frames} 帧")
+        with self._jitter_lock:
+            self._jitter_frames = frames
+            self._jitter_offset = None
+            self._jitter_added = None
+            if frames == 0:
+                queue = self._jitter_queue
+                if queue:
+                    self._frame = queue[-1][0]
+                    queue.clear()
+                self.jitter = None
+
+    def set_skip_frame(self, mode: str):
+        """解码器跳帧模式（见SKIP_FRAME_MODES），可在播放中切换"""
+        if mode not in SKIP_FRAME_MODES:
+            mode = "DEFAULT"
+        if mode != self._skip_frame:
+            self.logger.info(f"跳帧模式变更: {self._skip_frame} -> {mode}")
+            self._skip_frame = mode
+            self._skip_frame_changed = True
 
-        self._reset()
+    def set_max_fps(self, fps: int):
+        """限制输出帧率，超出的帧解码后不做转换"""
+        self._max_fps = max(0, fps)
+
+    def set_stall_timeout(self, seconds: float):
+        """设置断流判定时间，下次连接时作为读取超时生效"""
+        if seconds > 0 and seconds != self._stall_timeout:
+            self.logger.info(f"断流判定时间变更: {self._stall_timeout} -> {seconds}")
+            self._stall_timeout = seconds
+
+    def set_output_size(self, size: tuple[int, int] | None):
+        """设置输出画面尺寸，缩放、旋转、加黑边都在视频线程完成"""
+        if size is not None and (size[0] <= 0 or size[1] <= 0):
+            size = None
+        self._output_size = size
+
+    def set_output_format(self, output_format: str):
+        """"bgra"：按显示尺寸转换好的画面；"yuv"：解码器原始YUV平面，由OpenGL画面完成转换和缩放"""
+        if output_format not in ("bgra", "yuv"):
+            output_format = "bgra"
+        if output_format != self._output_format:
+            self.logger.info(f"视频输出格式变更: {self._output_format} -> {output_format}")
+            self._output_format = output_format
+
+    def last_reconnect_ttff(self, window=10.0) -> float | None:
+        """最近window秒内完成的（重）连接的出图耗时，没有则返回None"""
+        if time.perf_counter() - self._reconnected_at > window:
+            return None
+        return self.reconnect_ttff
 
     def run(self):
         self.logger.info("视频线程启动")
 
         while True:
+            if self._reset_requested:
+                self._reset_requested = False
+                self._reset(hold=False)
+
             if self._source is None:
                 time.sleep(0.1)
                 continue
 
-            if self._container is None:
-                self.logger.info(f"尝试连接视频源: {self._source}")
-                try:
-                    if self._source.startswith("video="):
-                        self._container = av.open(self._source, format='dshow') 
-                    elif self._source.startswith("/dev"):
-                        self._container = av.open(self._source, format='v4l2') 
-                    else:
-                        self._container = av.open(self._source, options={"timeout": "3000000"})  # 超时3秒（单位：微秒）
-                    self.logger.info(f"视频源连接成功")
-                except Exception as e:
-                    self.logger.info(f"连接视频源报错: {e}")
-                    time.sleep(0.1)
-                    continue
+            self._check_switch()
+
+            if self._container is None and not self._connect():
+                self._backoff()
+                continue
 
             self._read()
 
-    def _read(self):
+    def _connect(self) -> bool:
+        source = self._source
+        if self._disconnect_time is None:
+            self._disconnect_time = time.perf_counter()
+        try:
+            self._container, self._decoder, self._cached_decoder, self.decode_mode = self._open_stream(source)
+        except Exception as e:
+            self.logger.info(f"连接视频源报错: {e}")
+            return False
+
+        self._demuxer = Demuxer(self._container, self._is_live(source))
+        self._demuxer.start()
+        self.logger.info(f"视频源连接成功")
+        return True
+
+    def _open_stream(self, source):
+        """打开视频源并准备好解码器，返回(container, decoder, 是否使用缓存参数, 解码线程模式)"""
+        cache = self._stream_cache.get(source)
+        self.logger.info(f"尝试连接视频源: {source}" + ("（使用缓存的解码参数）" if cache else ""))
+        container = None
         try:
-            av_frame = next(self._container.decode(video=0))
-            # PyAV 返回的帧是 AVFrame 对象，需要转换为 numpy 数组给 OpenCV 使用（BGR格式）
-            frame = av_frame.to_ndarray(format="bgr24")
-            height, width = frame.shape[:2]
-            if height > width:
-                self.frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+            container = self._open(source, fast=cache is not None)
+            if cache is None:
+                decoder = container.streams.video[0].codec_context
             else:
-                self.frame = frame
-            self._update_fps()
+                decoder = self._create_decoder(cache)
+            decode_mode = self._setup_decoder(decoder, source)
+        except Exception:
+            if container is not None:
+                container.close()
+            self._stream_cache.pop(source, None)  # 缓存参数可能已失效，下次完整探测
+            raise
+        return container, decoder, cache is not None, decode_mode
+
+    def _check_switch(self):
+        """启动后台切换，新源出第一帧后整体替换当前连接"""
+        source = self._switch_source
+        switcher = self._switcher
+        if switcher is not None:
+            if switcher.source != source:
+                self._switcher = None
+                result = switcher.take()
+                if result is not None:
+                    result[4].stop()  # 切换已取消
+            elif switcher.result is not None:
+                self._switcher = None
+                self._adopt(switcher.source, switcher.start_time, switcher.take())
+                return
+        if source is not None and self._switcher is None:
+            self.logger.info(f"后台打开新视频源: {source}")
+            self._switcher = SourceSwitcher(self, source)
+            self._switcher.start()
+
+    def _adopt(self, source, start_time, result):
+        container, decoder, cached, decode_mode, demuxer, packets, av_frame = result
+        if self._demuxer is not None:
+            self._demuxer.stop()
+        elif self._container is not None:
+            self._container.close()
+
+        self._source = source
+        if self._switch_source == source:
+            self._switch_source = None
+        self._container, self._decoder, self._cached_decoder, self.decode_mode = container, decoder, cached, decode_mode
+        self._demuxer = demuxer
+        self._read_times.clear()
+        self._jitter_pts = None
+        self._disconnect_time = None
+        self.stalled = False
+        self._attempts = 0
+
+        # 后台解码用过的数据包按顺序交给录制线程
+        self._record(packet for packet, _ in packets)
+
+        now = time.perf_counter()
+        self.reconnect_ttff = now - start_time
+        self._reconnected_at = now
+        self.logger.info(f"视频源切换完成: {source}，耗时 {self.reconnect_ttff * 1000:.0f} ms")
+        if not cached:
+            self._cache_decoder()
+        self._output(av_frame, [packets[-1][1], now, None, None, None])
+
+    def _backoff(self):
+        """连接失败后等待，指数退避加随机抖动"""
+        time.sleep(backoff_delay(self._attempts))
+        self._attempts += 1
+
+    def _open(self, source, fast=False):
+        # 读取超时由PyAV的中断回调实现，数据停止时demux立即返回而不是一直阻塞
+        timeout = (OPEN_TIMEOUT, self._stall_timeout)
+        if source.startswith("video="):
+            return av.open(source, format='dshow', timeout=timeout)
+        if source.startswith("/dev"):
+            return av.open(source, format='v4l2', timeout=timeout)
+
+        raw_format, url = raw_stream(source)
+        options = {"timeout": "3000000"}  # 超时3秒（单位：微秒）
+        if self._is_low_latency(source):
+            for key, value in LATENCY_PROFILES[self._profile].items():
+                if key in ("rtsp_transport", "reorder_queue_size") and not url.startswith(("rtsp://", "rtsps://")):
+                    continue
+                options[key] = value
+        if fast:
+            options.update(FAST_OPEN_OPTIONS)
+
+        if url.startswith("udp://"):
+            # 没有RTSP会话，收到数据即可开始解码；未指定裸码流时按MPEG-TS解析
+            options.update(UDP_OPTIONS)
+            options.pop("fflags", None)  # nobuffer会丢掉探测时读到的数据包（通常就是首个关键帧），UDP直推本就没有重排缓冲
+            return av.open(url, format=raw_format or "mpegts", options=options, timeout=timeout)
+        return av.open(url, format=raw_format, options=options, timeout=timeout)
+
+    def _is_low_latency(self, source) -> bool:
+        return raw_stream(source)[1].startswith(NETWORK_SCHEMES) and self._profile != "default"
+
+    @staticmethod
+    def _is_live(source) -> bool:
+        return raw_stream(source)[1].startswith(NETWORK_SCHEMES + ("video=", "/dev"))
+
+    @staticmethod
+    def _create_decoder(cache):
+        """用缓存的参数创建解码器，不依赖容器的流分析结果"""
+        decoder = av.CodecContext.create(cache["codec"], "r")
+        if cache["extradata"]:
+            decoder.extradata = cache["extradata"]
+        decoder.width = cache["width"]
+        decoder.height = cache["height"]
+        return decoder
+
+    def _cache_decoder(self):
+        """解出第一帧后记下解码参数，供下次重连使用"""
+        decoder = self._decoder
+        self._stream_cache[self._source] = {
+            "codec": decoder.name,
+            "extradata": decoder.extradata,
+            "width": decoder.width,
+            "height": decoder.height,
+        }
+
+    def _setup_decoder(self, codec_context, source) -> str:
+        """在解码器打开前设置多线程解码，返回实际生效的模式"""
+        codec_context.skip_frame = self._skip_frame
+        if self._is_low_latency(source):
+            codec_context.flags |= av.codec.context.Flags.low_delay  # 解码器不做帧重排缓存，解出即输出
+        capabilities = codec_context.codec.capabilities
+        thread_type = self._thread_type
+        if thread_type == "SLICE" and not capabilities & av.codec.Capabilities.slice_threads:
+            thread_type = "NONE"
+        elif thread_type == "FRAME" and not capabilities & av.codec.Capabilities.frame_threads:
+            thread_type = "NONE"
+
+        if thread_type == "NONE":
+            thread_count = 1
+        else:
+            thread_count = self._thread_count or auto_thread_count()
+
+        codec_context.thread_type = thread_type
+        codec_context.thread_count = thread_count
+        decode_mode = f"{thread_type} x{thread_count}"
+        self.logger.info(f"解码器 {codec_context.name}: {decode_mode}")
+        return decode_mode
+
+    def _read(self):
+        demuxer = self._demuxer
+        try:
+            # 积压的数据包不解码，按读取顺序原样交给录制线程
+            dropped = demuxer.trim(DECODE_LATENCY_BUDGET)
+            if dropped:
+                self._count_dropped(len(dropped))
+                self._record(packet for packet, _ in dropped)
+            if demuxer.dropped:
+                self._count_dropped(demuxer.dropped)
+                demuxer.dropped = 0
+
+            item = demuxer.get(self._stall_timeout)
+            if item is None:
+                if time.perf_counter() - demuxer.last_read > self._stall_timeout:
+                    self._on_stall()
+                return
+            packet, read_time = item
+            if self._skip_frame_changed:
+                self._skip_frame_changed = False
+                self._decoder.skip_frame = self._skip_frame
+            if packet.pts is not None:
+                self._read_times[packet.pts] = read_time
+                if len(self._read_times) > 64:
+                    del self._read_times[next(iter(self._read_times))]
+
+            try:
+                for av_frame in self._decoder.decode(packet):
+                    decoded_time = time.perf_counter()
+                    if self._disconnect_time is not None:
+                        self._on_first_frame(decoded_time)
+                    stamps = [self._read_times.pop(av_frame.pts, read_time), decoded_time, None, None, None]
+                    if demuxer.behind(DECODE_LATENCY_BUDGET):
+                        self._count_dropped(1)  # 后面还有更新的画面，不做转换
+                        continue
+                    if self._max_fps and decoded_time - self._output_time < 1 / self._max_fps:
+                        continue  # 超出帧率上限
+                    self._output_time = decoded_time
+                    self._output(av_frame, stamps)
+            finally:
+                # 解码器已取走数据（或该包损坏），数据包交给录制线程写盘
+                self._record((packet,))
+        except StopIteration:
+            self.logger.error("视频流结束")
+            self._reset()
         except Exception as e:
-            if e.errno == 1094995529:
+            if getattr(e, "errno", None) == 1094995529:  # 数据损坏，跳过该包
+                return
+            if isinstance(e, av.error.ExitError):  # 读取超时
+                self._on_stall()
                 return
             self.logger.error(f"读取视频流报错: {e}")
+            if self._cached_decoder:
+                self._stream_cache.pop(self._source, None)  # 可能是缓存参数不匹配，下次完整探测
             self._reset()
             return
 
+    def _record(self, packets):
+        """处理完的数据包交给录制线程，录制线程会改写时间戳，必须等解码完"""
+        released = self._demuxer.finish(packets)
+        recorder = self.recorder
+        if recorder is not None:
+            for packet in released:
+                recorder.push(packet)
+
+    def _on_stall(self):
+        """读取超时：有过数据时立即重连，一直没有数据则按退避等待"""
+        demuxer = self._demuxer
+        waited = time.perf_counter() - demuxer.last_read
+        if demuxer.packets:
+            self.logger.warning(f"视频流 {waited * 1000:.0f} ms 无数据，立即重连")
+            self.stalled = self._frame is not None
+            self._reset()
+        else:
+            self.logger.info(f"视频源 {waited * 1000:.0f} ms 无数据")
+            self._reset()
+            self._backoff()
+
+    def _on_first_frame(self, now):
+        self.stalled = False
+        self._attempts = 0
+        self.reconnect_ttff = now - self._disconnect_time
+        self._reconnected_at = now
+        self._disconnect_time = None
+        self.logger.info(f"出图耗时 {self.reconnect_ttff * 1000:.0f} ms")
+        if not self._cached_decoder:
+            self._cache_decoder()
+
+    def _output(self, av_frame, stamps):
+        pts = None
+        if av_frame.pts is not None and av_frame.time_base is not None:
+            pts = float(av_frame.pts * av_frame.time_base)
+        output_format = self._output_format
+        if output_format == "yuv":
+            if av_frame.format.name not in YUV_FORMATS:
+                av_frame = av_frame.reformat(format="yuv420p")
+            self._publish(av_frame, output_format, stamps, pts)
+        else:
+            self._publish(self._convert(av_frame), output_format, stamps, pts)
+        self._update_fps()
+
+    def _convert(self, av_frame):
+        """用sws一步完成缩放和像素格式转换，输出UI可直接显示的BGRA画面
+
+        不需要旋转和加黑边时直接返回sws输出帧的视图，否则写入缓冲池中的画布，不逐帧分配。
+        """
+        src_w, src_h = av_frame.width, av_frame.height
+        rotate = src_h > src_w  # 竖屏画面顺时针旋转90度
+        if rotate:
+            src_w, src_h = src_h, src_w
+
+        output_size = self._output_size
+        if output_size is None:
+            dst_w, dst_h = src_w, src_h
+        else:
+            out_w, out_h = output_size
+            scale = min(out_w / src_w, out_h / src_h)
+            dst_w = max(2, int(src_w * scale))
+            dst_h = max(2, int(src_h * scale))
+
+        if output_size is None or (dst_w, dst_h) == output_size:
+            canvas = None
+            target = None
+        else:
+            # 居中加黑边；同一黑边位置的画布复用，黑边只在分配时清零一次
+            x, y = (out_w - dst_w) // 2, (out_h - dst_h) // 2
+            canvas = POOL.acquire((out_h, out_w, 4), tag=(x, y, dst_w, dst_h))
+            target = canvas[y:y + dst_h, x:x + dst_w]
+
+        if rotate:
+            av_frame = av_frame.reformat(dst_h, dst_w, "bgra", interpolation="BILINEAR")
+            if target is None:
+                target = POOL.acquire((dst_h, dst_w, 4))
+                canvas = target
+            cv2.rotate(av_frame.to_ndarray(), cv2.ROTATE_90_CLOCKWISE, dst=target)
+        else:
+            av_frame = av_frame.reformat(dst_w, dst_h, "bgra", interpolation="BILINEAR")
+            if target is None:
+                return av_frame.to_ndarray()  # sws输出帧的视图，不复制
+            target[:] = av_frame.to_ndarray()
+        return canvas
+
+    def _publish(self, image, output_format, stamps, pts=None):
+        """整体替换当前帧，读取方拿到的帧对象不会被改写"""
+        stamps[2] = time.perf_counter()
+        self._seq += 1
+        frame = VideoFrame(image, output_format, self._seq, stamps, self.latency)
+        with self._jitter_lock:
+            if self._jitter_frames:
+                self._queue_jitter(frame, pts, stamps[2])
+            else:
+                self._frame = frame
+
+    def _queue_jitter(self, frame, pts, now):
+        """按PTS计算放出时间：时钟偏移跟随最早到达的帧，再加上缓冲帧数对应的时长；持有_jitter_lock时调用"""
+        if pts is None:
+            due = now
+        else:
+            if self._jitter_pts is not None:
+                interval = pts - self._jitter_pts
+                if 0 < interval < 1:
+                    self._jitter_interval = self._jitter_interval * 0.9 + interval * 0.1
+                else:
+                    self._jitter_offset = None  # 时间戳不连续，重新对齐
+            self._jitter_pts = pts
+
+            lateness = now - pts
+            if self._jitter_offset is None or lateness < self._jitter_offset:
+                self._jitter_offset = lateness
+            else:
+                self._jitter_offset += JITTER_DRIFT
+            due = pts + self._jitter_offset + self._jitter_frames * self._jitter_interval
+
+        queue = self._jitter_queue
+        queue.append((frame, due))
+        while len(queue) > self._jitter_frames + 1:  # 缓冲溢出，丢最旧的
+            queue.popleft()
+
+    def _release_jitter(self):
+        """放出到期的帧，持有_jitter_lock时调用"""
+        queue = self._jitter_queue
+        now = time.perf_counter()
+        released = None
+        while queue and queue[0][1] <= now:
+            released = queue.popleft()[0]
+        if released is not None:
+            self._frame = released
+            held = (now - released.stamps[2]) * 1000
+            self._jitter_added = held if self._jitter_added is None else self._jitter_added * 0.9 + held * 0.1
+        self.jitter = (len(queue), self._jitter_added or 0.0)
+
     def _update_fps(self):
         """更新帧时间戳"""
         self._timestamps.append(time.time())
@@ -86,15 +966,46 @@ class Video(threading.Thread):
 
         self.fps = len(self._timestamps)
         self.logger.debug(f"视频流帧率 {self.fps} FPS")
+        self._count_dropped(0)
 
-    def _reset(self):
-        if self._container:
+    def _count_dropped(self, count: int):
+        """记录为追帧丢弃的数据包或画面，统计最近1秒的数量"""
+        now = time.time()
+        self._drop_times.extend([now] * count)
+        while self._drop_times and now - self._drop_times[0] > 1.0:
+            self._drop_times.popleft()
+        self.dropped = len(self._drop_times)
+        if count:
+            self.logger.debug(f"解码跟不上，丢弃 {count}")
+
+    def _reset(self, hold=True):
+        """断开当前连接；hold为True时保留最后一帧并标记为过期，否则清空画面"""
+        if self._demuxer is not None:
+            self._demuxer.stop()  # 读取线程退出时关闭容器
+            self._demuxer.join(self._stall_timeout)  # 读取超时内会退出，等它释放端口再重连
+            self._demuxer = None
+        elif self._container is not None:
             self._container.close()
-            self._container = None
+        self._container = None
+        self._decoder = None
+        self._read_times.clear()
+        self._jitter_pts = None
+        self._disconnect_time = time.perf_counter()
 
-        self.frame = None
+        frame = self._frame
+        if hold and frame is not None and not frame.stale:
+            self._seq += 1
+            self.frame = VideoFrame(frame.image, frame.format, self._seq, [None] * len(LATENCY_STAMPS),
+                                    self.latency, stale=True)
+        elif not hold:
+            self.frame = None
+            self.stalled = False
+            self._attempts = 0
         self.fps = None
+        self.dropped = None
+        self.decode_mode = None
         self._timestamps.clear()
+        self._drop_times.clear()
 
 
 if __name__ == "__main__":
@@ -104,12 +1015,14 @@ if __name__ == "__main__":
     video.start()
     # source = "rtsp://192.168.1.1:7070/webcam"
     # source = "video=Integrated Camera"
+    # source = "udp://0.0.0.0:5000"  # MPEG-TS over UDP
+    # source = "h264+udp://0.0.0.0:5000"  # H.264 Annex-B裸流 over UDP
     source = "video=USB Video"
     video.set_source(source)
 
     while True:
         if video.frame is not None:
-            cv2.imshow(source, video.frame)
+            cv2.imshow(source, video.frame.image)
             if cv2.waitKey(1) & 0xFF == ord("q"):
                 break
 
@@ -0,0 +1,462 @@
+import av
+import numpy as np
+
+import atexit
+import ctypes
+import multiprocessing
+import threading
+import time
+import weakref
+import logging
+from multiprocessing import shared_memory
+
+from video import LATENCY_STAMPS, LatencyStats, Video, VideoFrame
+
+RING_SLOTS = 5  # 最新帧、正在写入的帧、主进程刚读到的帧、UI还在显示的上一帧各占一个，再留一个让写入方读取间隔内能连写两帧
+
+# 环形缓冲区布局：控制字 | 各槽位帧头 | 各槽位画面数据
+CONTROL_DTYPE = np.dtype([("latest", "<i8"), ("pinned", "<i8")])  # 最新写完的槽位（-1表示无画面），主进程占用的槽位（位掩码）
+HEADER_DTYPE = np.dtype([
+    ("seq", "<i8"),  # -1表示正在写入
+    ("format", "<i4"),  # 见RING_FORMATS
+    ("stale", "<i4"),
+    ("width", "<i4"),
+    ("height", "<i4"),
+    ("stamps", "<f8", (3,)),  # 读到数据包、解码完成、转换完成，NaN表示没有
+])
+RING_FORMATS = ("bgra", "yuv420p", "yuvj420p")
+DATA_OFFSET = (CONTROL_DTYPE.itemsize + HEADER_DTYPE.itemsize * RING_SLOTS + 63) // 64 * 64
+
+
+class FrameRing:
+    """共享内存中的帧环形缓冲区，解码进程写入，主进程读取最新一帧
+
+    写入方从不写最新帧和主进程占用的槽位，主进程拿到的画面数据直接引用共享内存。
+    主进程正在读取的槽位和仍有画面引用的槽位都算占用（画面可能还在界面上显示），没有空闲槽位时写入方丢弃该帧。
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, slot_bytes: int):
+        self.shm = shm
+        self.slot_bytes = slot_bytes
+        self._control = np.ndarray((), CONTROL_DTYPE, buffer=shm.buf)
+        self._headers = np.ndarray((RING_SLOTS,), HEADER_DTYPE, buffer=shm.buf, offset=CONTROL_DTYPE.itemsize)
+        self._lock = threading.Lock()  # 写入方的视频线程和进程主循环都会写
+        self._views = []  # 交出去的bgra画面：(槽位, 所引用内存的弱引用)，回收前该槽位不能改写、缓冲区不能解除映射
+
+    @classmethod
+    def create(cls, slot_bytes: int):
+        shm = shared_memory.SharedMemory(create=True, size=DATA_OFFSET + slot_bytes * RING_SLOTS)
+        ring = cls(shm, slot_bytes)
+        ring._control["latest"] = -1
+        ring._control["pinned"] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, slot_bytes: int):
+        return cls(shared_memory.SharedMemory(name=name), slot_bytes)
+
+    @staticmethod
+    def frame_bytes(frame: VideoFrame) -> int:
+        image = frame.image
+        if frame.format == "yuv":
+            return (image.width & ~1) * (image.height & ~1) * 3 // 2
+        return image.nbytes
+
+    def write(self, frame: VideoFrame | None, seq: int) -> bool:
+        """写入一帧并设为最新，画面超出槽位大小或缓冲区已关闭时返回False"""
+        with self._lock:
+            control = self._control
+            if control is None:  # 缓冲区刚被替换并关闭，下一帧写入新缓冲区
+                return False
+            if frame is None:
+                control["latest"] = -1
+                return True
+
+            image = frame.image
+            if frame.format == "yuv":
+                width, height = image.width & ~1, image.height & ~1
+                pix_fmt = image.format.name if image.format.name in RING_FORMATS else "yuv420p"
+                if (width, height, pix_fmt) != (image.width, image.height, image.format.name):
+                    image = image.reformat(width, height, pix_fmt)
+                data = image.to_ndarray()  # 紧凑排列的Y、U、V平面，形状(h*3/2, w)
+            else:
+                height, width = image.shape[:2]
+                pix_fmt = "bgra"
+                data = image
+            if data.nbytes > self.slot_bytes:
+                return False
+
+            latest, pinned = int(control["latest"]), int(control["pinned"])
+            slot = next((i for i in range(RING_SLOTS) if i != latest and not pinned >> i & 1), None)
+            if slot is None:  # 主进程还引用着其余所有槽位，丢弃这一帧而不是改写正在显示的画面
+                return False
+            header = self._headers[slot]
+            header["seq"] = -1
+            dst = np.ndarray(data.shape, np.uint8, buffer=self.shm.buf, offset=DATA_OFFSET + slot * self.slot_bytes)
+            np.copyto(dst, data)
+            header["format"] = RING_FORMATS.index(pix_fmt)
+            header["stale"] = frame.stale
+            header["width"] = width
+            header["height"] = height
+            header["stamps"] = [np.nan if t is None else t for t in frame.stamps[:3]]
+            header["seq"] = seq
+            control["latest"] = slot
+            return True
+
+    def read(self, last: VideoFrame | None, latency: LatencyStats) -> VideoFrame | None:
+        """读取最新一帧，与last相同时直接返回last；bgra画面不拷贝"""
+        control = self._control
+        held = self._held_slots()  # 界面可能还在显示的画面，和新读取的槽位一起占住
+        while True:
+            slot = int(control["latest"])
+            if slot < 0:
+                return None
+            control["pinned"] = held | 1 << slot  # 一次写入，写入方不再覆盖这些槽位
+            header = self._headers[slot]
+            seq = int(header["seq"])
+            # 占住之前写入方可能已选中该槽位，最新槽位和帧序号都没变才说明已占住
+            if int(control["latest"]) == slot and int(header["seq"]) == seq:
+                break
+
+        if seq < 0 or (last is not None and last.seq == seq):
+            return last
+
+        width, height = int(header["width"]), int(header["height"])
+        pix_fmt = RING_FORMATS[int(header["format"])]
+        offset = DATA_OFFSET + slot * self.slot_bytes
+        if pix_fmt == "bgra":
+            # 每帧单独包一段内存，画面及其切片、QImage都引用它，据此判断缓冲区是否还在使用
+            buf = (ctypes.c_uint8 * (height * width * 4)).from_buffer(self.shm.buf, offset)
+            self._views.append((slot, weakref.ref(buf)))
+            image = np.ndarray((height, width, 4), np.uint8, buffer=buf)
+            output_format = "bgra"
+        else:
+            # OpenGL画面需要av.VideoFrame，这里拷贝一次YUV平面
+            data = np.ndarray((height * 3 // 2, width), np.uint8, buffer=self.shm.buf, offset=offset)
+            image = av.VideoFrame.from_ndarray(data, format=pix_fmt)
+            output_format = "yuv"
+
+        stale = bool(header["stale"])
+        stamps = [None] * len(LATENCY_STAMPS)
+        if not stale:
+            stamps[:3] = [float(t) for t in header["stamps"]]
+        return VideoFrame(image, output_format, seq, stamps, latency, stale=stale)
+
+    def _held_slots(self) -> int:
+        """仍有画面引用的槽位（位掩码）"""
+        self._views = [(slot, view) for slot, view in self._views if view() is not None]
+        held = 0
+        for slot, _ in self._views:
+            held |= 1 << slot
+        return held
+
+    @property
+    def in_use(self) -> bool:
+        """仍有画面引用该缓冲区的内存"""
+        return bool(self._held_slots())
+
+    def close(self) -> bool:
+        """解除映射，仍有画面引用时返回False，等画面回收后再调用；等正在进行的写入完成"""
+        with self._lock:
+            if self._control is None:
+                return True
+            if self.in_use:
+                return False
+            self._control = self._headers = None
+            self.shm.close()
+            return True
+
+
+class RecorderState:
+    """解码进程中录制线程的计数，字段与Recorder一致"""
+
+    def __init__(self, segments: int, dropped_segments: int):
+        self.segments = segments
+        self.dropped_segments = dropped_segments
+
+
+class _RingVideo(Video):
+    """解码进程中的Video，每出一帧直接写入共享内存"""
+
+    def __init__(self, level):
+        super().__init__(level)
+        self.ring: FrameRing | None = None
+        self.ring_request = 0  # 槽位不够大时请求的字节数，由进程主循环发给主进程
+
+    def _publish(self, image, output_format, stamps, pts=None):
+        super()._publish(image, output_format, stamps, pts)
+        if not self._jitter_frames:
+            self.write_ring(self._frame)
+
+    def write_ring(self, frame):
+        ring = self.ring
+        if frame is not None and (ring is None or FrameRing.frame_bytes(frame) > ring.slot_bytes):
+            self.ring_request = FrameRing.frame_bytes(frame)
+            return
+        if ring is not None:
+            ring.write(frame, frame.seq if frame is not None else 0)
+
+
+def _worker(conn, level):
+    """解码进程入口：执行主进程转发的设置，定时回报状态"""
+    logging.basicConfig(format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+    logger = logging.getLogger("VideoWorker")
+    logger.setLevel(level)
+
+    video = _RingVideo(level)
+    video.start()
+    logger.info("解码进程启动")
+
+    last_frame = None
+    requested = 0
+    status_time = 0.0
+    retired_rings = []  # 已替换、还没关闭的缓冲区
+    while True:
+        if conn.poll(0.01):
+            message = conn.recv()
+            if message[0] == "call":
+                getattr(video, message[1])(*message[2])
+            elif message[0] == "ring":
+                old = video.ring
+                video.ring = FrameRing.attach(message[1], message[2])
+                if old is not None:
+                    retired_rings.append(old)
+            elif message[0] == "stop":
+                break
+        if retired_rings:  # close()等视频线程写完，之后它拿到的是新缓冲区
+            retired_rings = [retired for retired in retired_rings if not retired.close()]
+
+        # 正常出帧已在视频线程写入，这里补上断线保留帧、清空画面和平滑缓冲放出的帧
+        frame = video.frame
+        if frame is not last_frame:
+            if frame is None or frame.stale or video.jitter is not None:
+                video.write_ring(frame)
+            last_frame = frame
+
+        if video.ring_request > requested:
+            requested = video.ring_request
+            conn.send(("ring", requested))
+
+        now = time.perf_counter()
+        if now - status_time >= 0.1:
+            status_time = now
+            recorder = video.recorder
+            conn.send(("status", {
+                "fps": video.fps,
+                "dropped": video.dropped,
+                "stalled": video.stalled,
+                "jitter": video.jitter,
+                "decode_mode": video.decode_mode,
+                "reconnect_ttff": video.reconnect_ttff,
+                "reconnected_at": video._reconnected_at,  # perf_counter在各进程间可比
+                "recorder": (recorder.segments, recorder.dropped_segments) if recorder else None,
+            }))
+
+    logger.info("解码进程退出")
+
+
+class VideoProcess(threading.Thread):
+    """在独立进程中解码的Video，接口与Video相同
+
+    解码、格式转换都不占主进程的GIL；画面经共享内存环形缓冲区传回，bgra画面不拷贝。
+    本线程负责启动（崩溃后重启）解码进程、转发设置和接收状态。
+    """
+
+    def __init__(self, level=logging.WARNING):
+        super().__init__(daemon=True)
+
+        self.logger = logging.getLogger("VideoProcess")
+        self.logger.setLevel(level)
+
+        # 可读取
+        self.fps = None
+        self.dropped = None
+        self.stalled = False
+        self.jitter = None
+        self.decode_mode: str | None = None
+        self.latency = LatencyStats()  # 由UI绘制完成时记录，含跨进程传递耗时
+        self.recorder: RecorderState | None = None
+        self.reconnect_ttff: float | None = None
+
+        self._level = level
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._send_lock = threading.Lock()
+        self._settings = {}  # 方法名 -> 参数，解码进程重启后重新下发
+        self._ring: FrameRing | None = None
+        self._retired_rings = []  # 已替换但可能仍被画面引用的缓冲区
+        self._ring_lock = threading.Lock()  # UI线程读取与本线程替换、关闭缓冲区互斥
+        self._frame: VideoFrame | None = None
+        self._reconnected_at = 0.0
+        self._stopping = False
+        atexit.register(self._shutdown)
+
+    @property
+    def frame(self) -> VideoFrame | None:
+        with self._ring_lock:
+            ring = self._ring
+            if ring is None:
+                return None
+            self._frame = ring.read(self._frame, self.latency)
+            return self._frame
+
+    def last_reconnect_ttff(self, window=10.0) -> float | None:
+        if time.perf_counter() - self._reconnected_at > window:
+            return None
+        return self.reconnect_ttff
+
+    def set_source(self, source):
+        self._call("set_source", source)
+
+    def set_profile(self, profile: str):
+        self._call("set_profile", profile)
+
+    def set_decode_threads(self, thread_type: str, thread_count: int = 0):
+        self._call("set_decode_threads", thread_type, thread_count)
+
+    def set_recording(self, enabled: bool, record_format="mkv"):
+        self._call("set_recording", enabled, record_format)
+
+    def set_match_state(self, countdown_ms, state):
+        self._call("set_match_state", countdown_ms, state)
+
+    def set_jitter_buffer(self, frames: int):
+        self._call("set_jitter_buffer", frames)
+
+    def set_skip_frame(self, mode: str):
+        self._call("set_skip_frame", mode)
+
+    def set_max_fps(self, fps: int):
+        self._call("set_max_fps", fps)
+
+    def set_stall_timeout(self, seconds: float):
+        self._call("set_stall_timeout", seconds)
+
+    def set_output_size(self, size: tuple[int, int] | None):
+        self._call("set_output_size", size)
+
+    def set_output_format(self, output_format: str):
+        self._call("set_output_format", output_format)
+
+    def _call(self, name, *args):
+        """设置有变化时才发给解码进程（Game每10ms调用一次）"""
+        if self._settings.get(name) == args:
+            return
+        self._settings[name] = args
+        self._send(("call", name, args))
+
+    def _send(self, message):
+        with self._send_lock:
+            conn = self._conn
+            if conn is None:
+                return
+            try:
+                conn.send(message)
+            except (OSError, ValueError):
+                pass  # 解码进程已退出，重启后会重新下发设置
+
+    def run(self):
+        self.logger.info("视频进程管理线程启动")
+
+        while not self._stopping:
+            if self._process is None or not self._process.is_alive():
+                self._start_process()
+
+            try:
+                if not self._conn.poll(0.1):
+                    continue
+                kind, data = self._conn.recv()
+            except (EOFError, OSError):
+                if self._stopping:
+                    break
+                self.logger.error("解码进程已退出，重新启动")
+                self._conn = None
+                time.sleep(0.5)
+                continue
+
+            if kind == "status":
+                self.fps = data["fps"]
+                self.dropped = data["dropped"]
+                self.stalled = data["stalled"]
+                self.jitter = data["jitter"]
+                self.decode_mode = data["decode_mode"]
+                self.reconnect_ttff = data["reconnect_ttff"]
+                self._reconnected_at = data["reconnected_at"]
+                recorder = data["recorder"]
+                self.recorder = RecorderState(*recorder) if recorder else None
+                if self._retired_rings:
+                    with self._ring_lock:
+                        self._close_retired_rings()
+            elif kind == "ring":
+                self._create_ring(data)
+
+    def _start_process(self):
+        if self._process is not None:
+            self._process.join(timeout=0)
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker, args=(child_conn, self._level), daemon=True)
+        process.start()
+        child_conn.close()
+        self.logger.info(f"解码进程已启动: pid {process.pid}")
+
+        with self._send_lock:
+            self._conn = parent_conn
+            self._process = process
+        if self._ring is not None:
+            self._send(("ring", self._ring.shm.name, self._ring.slot_bytes))
+        for name, args in self._settings.items():
+            self._send(("call", name, args))
+
+    def _create_ring(self, frame_bytes: int):
+        """按解码进程请求的画面大小（留出余量）重建缓冲区"""
+        slot_bytes = (frame_bytes * 5 // 4 + 4095) // 4096 * 4096
+        ring = FrameRing.create(slot_bytes)
+        self.logger.info(f"创建共享内存缓冲区: {RING_SLOTS} x {slot_bytes} 字节")
+        with self._ring_lock:
+            old, self._ring = self._ring, ring
+            if old is not None:
+                old.shm.unlink()
+                self._retired_rings.append(old)
+            self._close_retired_rings()
+        self._send(("ring", ring.shm.name, slot_bytes))
+
+    def _close_retired_rings(self):
+        """UI不再引用的旧缓冲区解除映射，持有_ring_lock时调用"""
+        self._retired_rings = [retired for retired in self._retired_rings if not retired.close()]
+
+    def _shutdown(self):
+        self._stopping = True
+        self._send(("stop",))
+        if self._process is not None:
+            self._process.join(timeout=1)
+        for ring in [self._ring] + self._retired_rings:
+            if ring is not None:
+                ring.close()
+        if self._ring is not None:
+            try:
+                self._ring.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+if __name__ == "__main__":
+    import cv2
+
+    logging.basicConfig(format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+    video = VideoProcess(logging.INFO)
+    video.start()
+    # source = "rtsp://192.168.1.1:7070/webcam"
+    # source = "video=Integrated Camera"
+    source = "video=USB Video"
+    video.set_source(source)
+
+    while True:
+        frame = video.frame
+        if frame is not None:
+            cv2.imshow(source, frame.image)
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                break
+
+    cv2.destroyAllWindows()